@@ -18,9 +18,11 @@ from risk_manager import RiskManager
 from notifier import Notifier
 from explainer import AIExplainer
 from market_analyzer import MarketAnalyzer
+from routes.json_provider import OrjsonProvider
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Initialize databases (keep both for backward compatibility)
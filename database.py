@@ -3,24 +3,120 @@ Database management module
 """
 import sqlite3
 import json
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+
+# Per-connection tuning (journal_mode=WAL itself is persistent, set in init_db).
+# NORMAL sync is durable under WAL; mmap lets readers skip read() syscalls.
+_CONNECTION_PRAGMAS = '''
+    PRAGMA synchronous = NORMAL;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+'''
+
+
+class _Connection(sqlite3.Connection):
+    """Connection whose commit/close are deferred while a transaction() is open"""
+    pinned = False
+    persistent = False
+
+    def commit(self):
+        if not self.pinned:
+            super().commit()
+
+    def close(self):
+        if not (self.pinned or self.persistent):
+            super().close()
+
 
 class Database:
-    def __init__(self, db_path: str = 'AITradeGame.db'):
+    def __init__(self, db_path: str = 'AITradeGame.db', persistent: bool = False):
+        """
+        Args:
+            db_path: SQLite database file
+            persistent: Keep one connection open per thread and reuse it
+                instead of opening a new one for every call
+        """
         self.db_path = db_path
-        
+        self.persistent = persistent
+        self._local = threading.local()
+
     def get_connection(self):
         """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+        conn = getattr(self._local, 'transaction_conn', None)
+        if conn is not None:
+            return conn
+        if self.persistent:
+            conn = getattr(self._local, 'conn', None)
+            if conn is not None:
+                return conn
+        # Larger statement cache: the app and suites use well over the default 128 queries
+        conn = sqlite3.connect(self.db_path, factory=_Connection, cached_statements=256)
         conn.row_factory = sqlite3.Row
+        conn.executescript(_CONNECTION_PRAGMAS)
+        if self.persistent:
+            conn.persistent = True
+            self._local.conn = conn
         return conn
+
+    def close(self):
+        """Close the persistent connection of the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            conn.persistent = False
+            conn.close()
+
+    def vacuum_and_analyze(self):
+        """Compact the file and refresh query planner statistics (maintenance only)"""
+        conn = self.get_connection()
+        conn.execute('VACUUM')
+        conn.execute('ANALYZE')
+        conn.execute('PRAGMA optimize')
+        conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group all writes made inside the block into one BEGIN IMMEDIATE/COMMIT.
+
+        Every get_connection() call on this thread returns the same connection
+        until the block exits, and the commit()/close() calls made by the
+        individual methods are deferred to the end of the block.
+        """
+        conn = getattr(self._local, 'transaction_conn', None)
+        if conn is not None:
+            # Nested block joins the outer transaction
+            yield conn
+            return
+
+        conn = self.get_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        conn.pinned = True
+        self._local.transaction_conn = conn
+        try:
+            yield conn
+            conn.pinned = False
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.transaction_conn = None
+            conn.pinned = False
+            conn.close()
     
     def init_db(self):
         """Initialize database tables"""
         conn = self.get_connection()
         cursor = conn.cursor()
 
+        # WAL lets readers run concurrently with a writer (persists in the file)
+        cursor.execute('PRAGMA journal_mode=WAL')
+
         # Providers table (API提供方)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS providers (
@@ -80,6 +176,16 @@ class Database:
             )
         ''')
         
+        # Create index for per-model trade history (newest first); ANALYZE once
+        # when it is first created so the planner has statistics for it
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_trades_model_timestamp'")
+        if not cursor.fetchone():
+            cursor.execute('''
+                CREATE INDEX idx_trades_model_timestamp
+                ON trades (model_id, timestamp DESC)
+            ''')
+            cursor.execute('ANALYZE trades')
+
         # Conversations table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS conversations (
@@ -218,6 +324,12 @@ class Database:
             )
         ''')
 
+        # Create index for per-model AI cost lookups
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_ai_costs_model_timestamp
+            ON ai_costs (model_id, timestamp)
+        ''')
+
         # Insert default graduation settings if none exist
         cursor.execute('SELECT COUNT(*) FROM graduation_settings')
         if cursor.fetchone()[0] == 0:
@@ -247,6 +359,25 @@ class Database:
                 ALTER TABLE graduation_settings ADD COLUMN min_testing_minutes INTEGER DEFAULT 0
             ''')
 
+        # Revision counter for the model list (models joined with providers),
+        # bumped by triggers so readers can tell "unchanged" without a scan
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS revisions (
+                name TEXT PRIMARY KEY,
+                revision INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO revisions (name) VALUES ('models')")
+        for table in ('models', 'providers'):
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_revision
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE revisions SET revision = revision + 1 WHERE name = 'models';
+                    END
+                ''')
+
         conn.commit()
         conn.close()
     
@@ -399,6 +530,33 @@ class Database:
         conn.close()
         return [dict(row) for row in rows]
     
+    def get_recent_trade_stats(self, model_id: int, limit: int = 20,
+                               window: int = 10) -> Tuple[int, int, int]:
+        """Loss streak and recent win count, aggregated in sqlite
+
+        Returns (consecutive_losses, wins, trades): the run of losing trades
+        at the head of the last `limit` trades, and the winning and total
+        trade counts among the last `window` trades.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            WITH recent AS (
+                SELECT pnl, ROW_NUMBER() OVER (ORDER BY timestamp DESC, id DESC) AS rn
+                FROM trades WHERE model_id = ?
+                ORDER BY timestamp DESC, id DESC LIMIT ?
+            )
+            SELECT
+                COALESCE((SELECT MIN(rn) FROM recent WHERE COALESCE(pnl, 0) >= 0) - 1,
+                         COUNT(*)),
+                COALESCE(SUM(rn <= ? AND pnl > 0), 0),
+                COALESCE(SUM(rn <= ?), 0)
+            FROM recent
+        ''', (model_id, limit, window, window))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0], row[1], row[2]
+    
     # ============ Conversation History ============
     
     def add_conversation(self, model_id: int, user_prompt: str, 
@@ -446,6 +604,7 @@ class Database:
 
         # Calculate time threshold based on range
         time_filter = ""
+        params = [model_id]
         if time_range:
             from datetime import datetime, timedelta
             now = datetime.now()
@@ -462,12 +621,14 @@ class Database:
                 threshold = None
 
             if threshold:
-                time_filter = f" AND timestamp >= '{threshold.strftime('%Y-%m-%d %H:%M:%S')}'"
+                time_filter = " AND timestamp >= ?"
+                params.append(threshold.strftime('%Y-%m-%d %H:%M:%S'))
 
+        params.append(limit)
         cursor.execute(f'''
             SELECT * FROM account_values WHERE model_id = ?{time_filter}
             ORDER BY timestamp DESC LIMIT ?
-        ''', (model_id, limit))
+        ''', params)
         rows = cursor.fetchall()
         conn.close()
         return [dict(row) for row in rows]
@@ -705,6 +866,29 @@ class Database:
         conn.close()
         return [dict(row) for row in rows]
 
+    def get_models_revision(self) -> str:
+        """
+        Version tag of the get_all_models() result
+
+        Changes whenever a model or provider row changes, or the schema does.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT revision FROM revisions WHERE name = 'models'")
+        row = cursor.fetchone()
+        schema_version = cursor.execute('PRAGMA schema_version').fetchone()[0]
+        conn.close()
+        return f"{schema_version}-{row['revision'] if row else 0}"
+
+    def get_first_model_id(self) -> Optional[int]:
+        """Get the lowest model ID (primary-key lookup, no full scan)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM models ORDER BY id LIMIT 1')
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
     def update_model(self, model_id: int, name: str = None, provider_id: int = None, model_name: str = None, initial_capital: float = None):
         """Update model information"""
         conn = self.get_connection()
@@ -750,6 +934,16 @@ class Database:
         conn.commit()
         conn.close()
 
+    def store_price_snapshots(self, rows: List[tuple]):
+        """Store several (coin, price) snapshots in one transaction"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO price_snapshots (coin, price) VALUES (?, ?)
+        ''', rows)
+        conn.commit()
+        conn.close()
+
     def get_price_at_timestamp(self, coin: str, timestamp: str) -> Optional[float]:
         """Get closest price to a given timestamp"""
         conn = self.get_connection()
@@ -776,6 +970,19 @@ class Database:
         conn.close()
         return dict(row) if row else None
 
+    # ============ Settings Helpers ============
+
+    def _check_columns(self, cursor, table: str, settings: Dict):
+        """Raise ValueError naming any keys that are not columns of table
+
+        The keys are interpolated into SQL, so only column names get through.
+        """
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = {row['name'] for row in cursor.fetchall()}
+        unknown = sorted(key for key in settings if key not in columns)
+        if unknown:
+            raise ValueError(f"Unknown {table} keys: {', '.join(unknown)}")
+
     # ============ Graduation Settings ============
 
     def get_graduation_settings(self) -> Dict:
@@ -792,6 +999,15 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
 
+        try:
+            self._check_columns(cursor, 'graduation_settings', settings)
+        except ValueError:
+            conn.close()
+            raise
+        if not settings:
+            conn.close()
+            return
+
         # Get existing settings ID
         cursor.execute('SELECT id FROM graduation_settings ORDER BY id DESC LIMIT 1')
         row = cursor.fetchone()
@@ -832,6 +1048,15 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
 
+        try:
+            self._check_columns(cursor, 'benchmark_settings', settings)
+        except ValueError:
+            conn.close()
+            raise
+        if not settings:
+            conn.close()
+            return
+
         cursor.execute('SELECT id FROM benchmark_settings ORDER BY id DESC LIMIT 1')
         row = cursor.fetchone()
         settings_id = row['id'] if row else None
@@ -869,6 +1094,15 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
 
+        try:
+            self._check_columns(cursor, 'cost_tracking_settings', settings)
+        except ValueError:
+            conn.close()
+            raise
+        if not settings:
+            conn.close()
+            return
+
         cursor.execute('SELECT id FROM cost_tracking_settings ORDER BY id DESC LIMIT 1')
         row = cursor.fetchone()
         settings_id = row['id'] if row else None
@@ -904,6 +1138,21 @@ class Database:
         conn.commit()
         conn.close()
 
+    def store_ai_costs_batch(self, costs: List[Dict]):
+        """Store several AI API costs in one transaction"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO ai_costs (model_id, cost_type, tokens_used, cost_usd, provider, model_name)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [
+            (c['model_id'], c['cost_type'], c.get('tokens_used'), c['cost_usd'],
+             c.get('provider'), c.get('model_name'))
+            for c in costs
+        ])
+        conn.commit()
+        conn.close()
+
     def get_ai_costs(self, model_id: int, start_date: str = None, end_date: str = None) -> List[Dict]:
         """Get AI costs for a model"""
         conn = self.get_connection()
@@ -931,9 +1180,20 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('''
-            SELECT COALESCE(SUM(cost_usd), 0) as total FROM ai_costs WHERE model_id = ?
+            SELECT COALESCE(SUM(cost_usd), 0) FROM ai_costs WHERE model_id = ?
         ''', (model_id,))
-        row = cursor.fetchone()
+        total = cursor.fetchone()[0]
+        conn.close()
+        return total
+
+    def get_total_tokens(self, model_id: int) -> int:
+        """Get total AI tokens used by a model"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT COALESCE(SUM(tokens_used), 0) FROM ai_costs WHERE model_id = ?
+        ''', (model_id,))
+        total = cursor.fetchone()[0]
         conn.close()
-        return row['total']
+        return total
 
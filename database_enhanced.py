@@ -10,6 +10,7 @@ Extends the original database with new tables for:
 """
 import sqlite3
 import json
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
 from database import Database  # Inherit from original
@@ -157,6 +158,11 @@ class EnhancedDatabase(Database):
             )
         ''')
 
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_incidents_model_type
+            ON incidents (model_id, incident_type, timestamp DESC)
+        ''')
+
         # ============ Readiness Metrics Table ============
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS readiness_metrics (
@@ -272,6 +278,22 @@ class EnhancedDatabase(Database):
         if 'active_profile_id' not in settings_columns:
             cursor.execute('ALTER TABLE model_settings ADD COLUMN active_profile_id INTEGER REFERENCES risk_profiles(id)')
 
+        # Add expires_at_ts (epoch seconds) to pending_decisions if not exists
+        cursor.execute("PRAGMA table_info(pending_decisions)")
+        pending_columns = [col[1] for col in cursor.fetchall()]
+        if 'expires_at_ts' not in pending_columns:
+            cursor.execute('ALTER TABLE pending_decisions ADD COLUMN expires_at_ts INTEGER')
+            # Backfill existing rows once, so readers never parse expires_at.
+            # Rows whose expires_at can't be parsed stay NULL and count as expired
+            cursor.execute('SELECT id, expires_at FROM pending_decisions WHERE expires_at IS NOT NULL')
+            backfill = []
+            for row in cursor.fetchall():
+                try:
+                    backfill.append((int(datetime.fromisoformat(str(row[1])).timestamp()), row[0]))
+                except ValueError:
+                    continue
+            cursor.executemany('UPDATE pending_decisions SET expires_at_ts = ? WHERE id = ?', backfill)
+
         # ============ Reports Table ============
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS reports (
@@ -349,8 +371,11 @@ class EnhancedDatabase(Database):
         row = cursor.fetchone()
         conn.close()
 
-        if row:
-            settings = dict(row)
+        return self._parse_model_settings(dict(row) if row else None)
+
+    def _parse_model_settings(self, settings: Optional[Dict]) -> Dict:
+        """model_settings row dict with JSON fields decoded, or defaults if None"""
+        if settings:
             # Parse JSON fields
             if settings.get('supported_assets'):
                 try:
@@ -362,6 +387,42 @@ class EnhancedDatabase(Database):
             # Return defaults if not found
             return self._get_default_settings()
 
+    def get_model_bundle(self, model_id: int) -> Dict:
+        """
+        Trading config and model settings in one query
+
+        Returns the get_trading_config() keys plus 'settings' as returned
+        by get_model_settings().
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT m.trading_environment, m.automation_level, m.exchange_environment,
+                   s.*
+            FROM models m
+            LEFT JOIN model_settings s ON s.model_id = m.id
+            WHERE m.id = ?
+        ''', (model_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return {'environment': 'simulation', 'automation': 'manual',
+                    'exchange_environment': 'testnet',
+                    'settings': self._get_default_settings()}
+
+        data = dict(row)
+        config = {
+            'environment': data.pop('trading_environment') or 'simulation',
+            'automation': data.pop('automation_level') or 'manual',
+            'exchange_environment': data.pop('exchange_environment') or 'testnet'
+        }
+        config['settings'] = self._parse_model_settings(
+            data if data['model_id'] is not None else None
+        )
+        return config
+
     def update_model_settings(self, model_id: int, settings: Dict):
         """Update model settings"""
         conn = self.get_connection()
@@ -433,14 +494,16 @@ class EnhancedDatabase(Database):
         conn = self.get_connection()
         cursor = conn.cursor()
 
-        from datetime import timedelta
-        expires_at = datetime.now() + timedelta(hours=expires_in_hours)
+        # Readable timestamp for the UI, epoch seconds for expiry checks
+        expires_at_ts = time.time() + expires_in_hours * 3600
+        expires_at = datetime.fromtimestamp(expires_at_ts)
 
         cursor.execute('''
             INSERT INTO pending_decisions
-            (model_id, coin, decision_data, explanation_data, expires_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (model_id, coin, json.dumps(decision), json.dumps(explanation), expires_at))
+            (model_id, coin, decision_data, explanation_data, expires_at, expires_at_ts)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (model_id, coin, json.dumps(decision), json.dumps(explanation), expires_at,
+              int(expires_at_ts)))
 
         decision_id = cursor.lastrowid
         conn.commit()
@@ -462,18 +525,29 @@ class EnhancedDatabase(Database):
         rows = cursor.fetchall()
         conn.close()
 
-        results = []
-        for row in rows:
-            data = dict(row)
-            # Parse JSON fields
-            data['decision_data'] = json.loads(data['decision_data'])
-            if data['explanation_data']:
-                data['explanation_data'] = json.loads(data['explanation_data'])
-            if data['modified_data']:
-                data['modified_data'] = json.loads(data['modified_data'])
-            results.append(data)
+        return [self._parse_pending_decision(row) for row in rows]
 
-        return results
+    def get_pending_decision(self, decision_id: int) -> Optional[Dict]:
+        """Get a single pending decision by id, whatever its status"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT * FROM pending_decisions WHERE id = ?', (decision_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        return self._parse_pending_decision(row) if row else None
+
+    @staticmethod
+    def _parse_pending_decision(row) -> Dict:
+        """Row to dict with its JSON fields decoded"""
+        data = dict(row)
+        data['decision_data'] = json.loads(data['decision_data'])
+        if data['explanation_data']:
+            data['explanation_data'] = json.loads(data['explanation_data'])
+        if data['modified_data']:
+            data['modified_data'] = json.loads(data['modified_data'])
+        return data
 
     def update_pending_decision(self, decision_id: int, status: str,
                                rejection_reason: str = None, modified_data: Dict = None):
@@ -540,6 +614,27 @@ class EnhancedDatabase(Database):
 
         return results
 
+    def get_incident_counts(self, model_id: int, incident_types: List[str] = None) -> Dict[str, int]:
+        """Count a model's incidents per type (optionally only the given types)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        query = 'SELECT incident_type, COUNT(*) FROM incidents WHERE model_id = ?'
+        params = [model_id]
+        if incident_types:
+            query += f" AND incident_type IN ({','.join('?' * len(incident_types))})"
+            params.extend(incident_types)
+        query += ' GROUP BY incident_type'
+
+        cursor.execute(query, params)
+        counts = {row[0]: row[1] for row in cursor.fetchall()}
+        conn.close()
+
+        # Requested types with no incidents report 0
+        for incident_type in incident_types or []:
+            counts.setdefault(incident_type, 0)
+        return counts
+
     # ============ Mode Management (NEW ARCHITECTURE) ============
 
     def get_trading_environment(self, model_id: int) -> str:
@@ -653,35 +748,92 @@ class EnhancedDatabase(Database):
             details={'new_exchange_environment': exchange_env}
         )
 
+    def get_trading_config(self, model_id: int) -> Dict:
+        """Get environment, automation and exchange environment in one query"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT trading_environment, automation_level, exchange_environment
+            FROM models WHERE id = ?
+        ''', (model_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return {'environment': 'simulation', 'automation': 'manual',
+                    'exchange_environment': 'testnet'}
+        return {
+            'environment': row['trading_environment'] or 'simulation',
+            'automation': row['automation_level'] or 'manual',
+            'exchange_environment': row['exchange_environment'] or 'testnet'
+        }
+
+    def set_trading_config(self, model_id: int, environment: str = None,
+                           automation: str = None):
+        """
+        Set environment and/or automation level with a single UPDATE
+
+        Both changes (and their incidents) are committed together, so a
+        caller never observes the environment switched without the matching
+        automation level.
+        """
+        if environment is not None and environment not in ['simulation', 'live']:
+            raise ValueError(f"Invalid environment: {environment}")
+        if automation is not None and automation not in ['manual', 'semi_automated', 'fully_automated']:
+            raise ValueError(f"Invalid automation level: {automation}")
+
+        assignments = {}
+        if environment is not None:
+            assignments['trading_environment'] = environment
+        if automation is not None:
+            assignments['automation_level'] = automation
+        if not assignments:
+            return
+
+        with self.transaction() as conn:
+            set_clause = ', '.join(f'{column} = ?' for column in assignments)
+            conn.execute(f'UPDATE models SET {set_clause} WHERE id = ?',
+                         (*assignments.values(), model_id))
+
+            if environment is not None:
+                self.log_incident(
+                    model_id=model_id,
+                    incident_type='ENVIRONMENT_CHANGE',
+                    severity='high' if environment == 'live' else 'low',
+                    message=f'Trading environment changed to {environment}',
+                    details={'new_environment': environment}
+                )
+            if automation is not None:
+                self.log_incident(
+                    model_id=model_id,
+                    incident_type='AUTOMATION_CHANGE',
+                    severity='medium',
+                    message=f'Automation level changed to {automation}',
+                    details={'new_automation_level': automation}
+                )
+
     # ============ Legacy Mode Management (For Backward Compatibility) ============
 
+    @staticmethod
+    def legacy_mode(environment: str, automation: str) -> str:
+        """Map environment + automation to the legacy single trading mode"""
+        if environment == 'live' and automation in ('semi_automated', 'fully_automated'):
+            return automation
+        return 'simulation'
+
     def get_model_mode(self, model_id: int) -> str:
         """DEPRECATED: Get trading mode (use get_trading_environment + get_automation_level)"""
-        environment = self.get_trading_environment(model_id)
-        automation = self.get_automation_level(model_id)
-
-        # Map to legacy mode
-        if environment == 'simulation':
-            return 'simulation'
-        elif environment == 'live' and automation == 'semi_automated':
-            return 'semi_automated'
-        elif environment == 'live' and automation == 'fully_automated':
-            return 'fully_automated'
-        else:
-            return 'simulation'
+        config = self.get_trading_config(model_id)
+        return self.legacy_mode(config['environment'], config['automation'])
 
     def set_model_mode(self, model_id: int, mode: str):
         """DEPRECATED: Set trading mode (use set_trading_environment + set_automation_level)"""
         # Map legacy mode to new architecture
         if mode == 'simulation':
-            self.set_trading_environment(model_id, 'simulation')
-            self.set_automation_level(model_id, 'manual')
-        elif mode == 'semi_automated':
-            self.set_trading_environment(model_id, 'live')
-            self.set_automation_level(model_id, 'semi_automated')
-        elif mode == 'fully_automated':
-            self.set_trading_environment(model_id, 'live')
-            self.set_automation_level(model_id, 'fully_automated')
+            self.set_trading_config(model_id, 'simulation', 'manual')
+        elif mode in ('semi_automated', 'fully_automated'):
+            self.set_trading_config(model_id, 'live', mode)
         else:
             raise ValueError(f"Invalid mode: {mode}")
 
@@ -974,25 +1126,19 @@ class EnhancedDatabase(Database):
             }
         ]
 
-        for profile in system_profiles:
-            cursor.execute('''
-                INSERT OR IGNORE INTO risk_profiles
-                (name, description, color, icon, is_system_preset,
-                 max_position_size_pct, max_open_positions, min_cash_reserve_pct,
-                 max_daily_loss_pct, max_drawdown_pct, max_daily_trades,
-                 trading_interval_minutes, auto_pause_consecutive_losses,
-                 auto_pause_win_rate_threshold, auto_pause_volatility_multiplier,
-                 trading_fee_rate, ai_temperature, ai_strategy)
-                VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                profile['name'], profile['description'], profile['color'], profile['icon'],
-                profile['max_position_size_pct'], profile['max_open_positions'],
-                profile['min_cash_reserve_pct'], profile['max_daily_loss_pct'],
-                profile['max_drawdown_pct'], profile['max_daily_trades'],
-                profile['trading_interval_minutes'], profile['auto_pause_consecutive_losses'],
-                profile['auto_pause_win_rate_threshold'], profile['auto_pause_volatility_multiplier'],
-                profile['trading_fee_rate'], profile['ai_temperature'], profile['ai_strategy']
-            ))
+        columns = ('name', 'description', 'color', 'icon',
+                   'max_position_size_pct', 'max_open_positions', 'min_cash_reserve_pct',
+                   'max_daily_loss_pct', 'max_drawdown_pct', 'max_daily_trades',
+                   'trading_interval_minutes', 'auto_pause_consecutive_losses',
+                   'auto_pause_win_rate_threshold', 'auto_pause_volatility_multiplier',
+                   'trading_fee_rate', 'ai_temperature', 'ai_strategy')
+
+        # One prepared statement for all presets, committed together
+        cursor.executemany(f'''
+            INSERT OR IGNORE INTO risk_profiles
+            ({', '.join(columns)}, is_system_preset)
+            VALUES ({', '.join('?' * len(columns))}, 1)
+        ''', [tuple(profile[column] for column in columns) for profile in system_profiles])
 
         conn.commit()
         conn.close()
@@ -1013,6 +1159,25 @@ class EnhancedDatabase(Database):
 
         return [dict(row) for row in rows]
 
+    def get_risk_profiles_by_name(self, names: List[str]) -> List[Dict]:
+        """Get the active profiles with the given names (summary columns only)"""
+        if not names:
+            return []
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        placeholders = ', '.join('?' * len(names))
+        cursor.execute(f'''
+            SELECT id, name, icon, description FROM risk_profiles
+            WHERE is_active = 1 AND name IN ({placeholders})
+        ''', list(names))
+
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [dict(row) for row in rows]
+
     def get_risk_profile(self, profile_id: int) -> Optional[Dict]:
         """Get a specific risk profile by ID"""
         conn = self.get_connection()
@@ -1127,8 +1292,21 @@ class EnhancedDatabase(Database):
         conn.commit()
         conn.close()
 
-    def apply_risk_profile(self, model_id: int, profile_id: int):
-        """Apply a risk profile to a model"""
+    def apply_risk_profile(self, model_id: int, profile_id: int) -> Dict:
+        """
+        Apply a risk profile to a model
+
+        All writes commit together, and the active profile is read back
+        inside the same transaction.
+
+        Returns:
+            The model's active profile after the change
+        """
+        with self.transaction():
+            return self._apply_risk_profile(model_id, profile_id)
+
+    def _apply_risk_profile(self, model_id: int, profile_id: int) -> Dict:
+        """Apply a risk profile (caller holds the transaction)"""
         profile = self.get_risk_profile(profile_id)
         if not profile:
             raise ValueError(f"Profile {profile_id} not found")
@@ -1136,6 +1314,9 @@ class EnhancedDatabase(Database):
         # End current profile session if any
         self._end_current_profile_session(model_id)
 
+        # Models without a settings row would otherwise update nothing
+        self.init_model_settings(model_id)
+
         # Update model settings with profile parameters
         settings = {
             'max_position_size_pct': profile['max_position_size_pct'],
@@ -1168,6 +1349,9 @@ class EnhancedDatabase(Database):
             details={'profile_id': profile_id, 'profile_name': profile['name']}
         )
 
+        active_profile_id = self.get_model_settings(model_id).get('active_profile_id')
+        return self.get_risk_profile(active_profile_id) if active_profile_id else None
+
     def _start_profile_session(self, model_id: int, profile_id: int, profile_name: str):
         """Start a new profile session"""
         conn = self.get_connection()
@@ -36,6 +36,9 @@ class ExchangeClient:
     TESTNET_API_URL = 'https://testnet.binance.vision/api'
     TESTNET_STREAM_URL = 'wss://testnet.binance.vision/ws'
 
+    # Seconds a fetched ticker price is reused before hitting the API again
+    TICKER_CACHE_TTL = 0.5
+
     def __init__(
         self,
         api_key: str,
@@ -56,6 +59,7 @@ class ExchangeClient:
         self.api_secret = api_secret
         self.testnet = testnet
         self.timeout = timeout
+        self._ticker_cache: Dict[str, Tuple[float, float]] = {}  # symbol -> (fetched_at, price)
 
         # Initialize client
         if testnet:
@@ -185,9 +189,15 @@ class ExchangeClient:
         Returns:
             Current price as float
         """
+        cached = self._ticker_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < self.TICKER_CACHE_TTL:
+            return cached[1]
+
         try:
             ticker = self.client.get_symbol_ticker(symbol=symbol)
-            return float(ticker['price'])
+            price = float(ticker['price'])
+            self._ticker_cache[symbol] = (time.monotonic(), price)
+            return price
 
         except BinanceAPIException as e:
             logger.error(f"❌ Failed to get price for {symbol}: {e.message}")
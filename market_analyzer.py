@@ -7,10 +7,18 @@ No external APIs required - uses only internal trade history
 from typing import Dict, List, Tuple
 from database_enhanced import EnhancedDatabase
 import math
+import time
 
 class MarketAnalyzer:
     """Analyzes market conditions and recommends risk profiles"""
 
+    # Seconds computed metrics are reused while no new trade has been recorded
+    METRICS_TTL = 5.0
+
+    # Shared by all analyzers (routes build one per request):
+    # (db_path, model_id) -> (computed_at, last_trade_id, metrics)
+    _metrics_cache: Dict[Tuple[str, int], Tuple[float, int, Dict]] = {}
+
     def __init__(self, db: EnhancedDatabase):
         self.db = db
 
@@ -54,22 +62,29 @@ class MarketAnalyzer:
             conn = self.db.get_connection()
             cursor = conn.cursor()
 
+            # Peak and latest of the last 100 values in one aggregate, no rows
+            # materialised in Python (the window is newest first, so the
+            # latest value is the first row)
             cursor.execute('''
-                SELECT portfolio_value FROM portfolio_history
-                WHERE model_id = ?
-                ORDER BY timestamp DESC
-                LIMIT 100
-            ''', (model_id,))
-
-            history = cursor.fetchall()
+                SELECT MAX(portfolio_value) as peak,
+                       (SELECT portfolio_value FROM portfolio_history
+                        WHERE model_id = ? ORDER BY timestamp DESC LIMIT 1) as current
+                FROM (
+                    SELECT portfolio_value FROM portfolio_history
+                    WHERE model_id = ?
+                    ORDER BY timestamp DESC
+                    LIMIT 100
+                )
+            ''', (model_id, model_id))
+
+            row = cursor.fetchone()
             conn.close()
 
-            if not history:
+            if row is None or row['peak'] is None:
                 return 0.0, 0.0
 
-            values = [row['portfolio_value'] for row in history]
-            current_value = values[0]
-            peak_value = max(values)
+            current_value = row['current']
+            peak_value = row['peak']
 
             if peak_value == 0:
                 return 0.0, 0.0
@@ -100,7 +115,7 @@ class MarketAnalyzer:
     def calculate_daily_performance(self, model_id: int) -> Dict:
         """Calculate today's performance metrics"""
         try:
-            from datetime import datetime
+            from datetime import datetime, timedelta
 
             # Get model info for initial capital
             model = self.db.get_model(model_id)
@@ -124,13 +139,14 @@ class MarketAnalyzer:
             daily_pnl = current_value - initial_capital
             daily_pnl_pct = (daily_pnl / initial_capital * 100) if initial_capital > 0 else 0
 
-            # Count today's trades
-            today = datetime.now().strftime('%Y-%m-%d')
+            # Count today's trades (range on timestamp so idx_trades_model_timestamp is used)
+            today = datetime.now().date()
+            tomorrow = today + timedelta(days=1)
 
             cursor.execute('''
                 SELECT COUNT(*) as count FROM trades
-                WHERE model_id = ? AND timestamp LIKE ? AND signal != 'hold'
-            ''', (model_id, f'{today}%'))
+                WHERE model_id = ? AND timestamp >= ? AND timestamp < ? AND signal != 'hold'
+            ''', (model_id, today.isoformat(), tomorrow.isoformat()))
 
             trades_today = cursor.fetchone()['count']
 
@@ -152,34 +168,98 @@ class MarketAnalyzer:
                 'current_value': 0
             }
 
+    def _last_trade_id(self, model_id: int) -> int:
+        """Latest trade row ID for a model, used to invalidate cached metrics"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM trades WHERE model_id = ?', (model_id,))
+        last_id = cursor.fetchone()[0]
+        conn.close()
+        return last_id
+
     def get_market_metrics(self, model_id: int) -> Dict:
+        """
+        Get market condition metrics, reusing a result computed within
+        METRICS_TTL seconds if no trade has been added since
+        """
+        key = (self.db.db_path, model_id)
+        last_trade_id = self._last_trade_id(model_id)
+        now = time.monotonic()
+
+        cached = self._metrics_cache.get(key)
+        if cached and cached[1] == last_trade_id and now - cached[0] < self.METRICS_TTL:
+            return dict(cached[2])
+
+        metrics = self.calculate_market_metrics(model_id)
+        self._metrics_cache[key] = (now, last_trade_id, metrics)
+        return dict(metrics)
+
+    def calculate_market_metrics(self, model_id: int) -> Dict:
         """
         Calculate all market condition metrics
         Returns comprehensive analysis of current conditions
         """
-        # Get recent trades (last 30)
-        all_trades = self.db.get_trades(model_id, limit=50)
-        recent_trades = all_trades[:30] if len(all_trades) > 30 else all_trades
-        very_recent_trades = all_trades[:10] if len(all_trades) > 10 else all_trades
+        # PnL of the last 50 trades, newest first (only the column we need)
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT pnl FROM trades WHERE model_id = ?
+            ORDER BY timestamp DESC LIMIT 50
+        ''', (model_id,))
+        pnls = [row[0] or 0 for row in cursor.fetchall()]
+        conn.close()
 
         # Calculate metrics
-        win_rate = self.calculate_win_rate(recent_trades)
-        recent_win_rate = self.calculate_win_rate(very_recent_trades)
-        volatility = self.calculate_volatility(recent_trades)
+        stats = self._compute_trade_stats(pnls)
         drawdown_pct, peak_value = self.calculate_drawdown(model_id)
-        consecutive_losses = self.calculate_consecutive_losses(all_trades)
         daily_perf = self.calculate_daily_performance(model_id)
 
         return {
-            'win_rate': win_rate,
-            'recent_win_rate': recent_win_rate,  # Last 10 trades
-            'volatility': volatility,
+            'win_rate': stats['win_rate'],
+            'recent_win_rate': stats['recent_win_rate'],  # Last 10 trades
+            'volatility': stats['volatility'],
             'drawdown_pct': drawdown_pct,
             'peak_value': peak_value,
-            'consecutive_losses': consecutive_losses,
+            'consecutive_losses': stats['consecutive_losses'],
             'daily_pnl_pct': daily_perf['daily_pnl_pct'],
             'trades_today': daily_perf['trades_today'],
-            'total_trades': len(all_trades)
+            'total_trades': len(pnls)
+        }
+
+    @staticmethod
+    def _compute_trade_stats(pnls: List[float]) -> Dict:
+        """
+        Single pass over trade PnLs (newest first) computing what
+        calculate_win_rate / calculate_volatility / calculate_consecutive_losses
+        return for the last 30, last 10 and all trades respectively
+        """
+        count_30 = wins_30 = wins_10 = 0
+        total_30 = total_sq_30 = 0.0
+        losses_run = 0  # Losses after the last win, i.e. reversed() scan of the list
+
+        for i, pnl in enumerate(pnls):
+            win = pnl > 0
+            if i < 30:
+                count_30 += 1
+                total_30 += pnl
+                total_sq_30 += pnl * pnl
+                if win:
+                    wins_30 += 1
+                    if i < 10:
+                        wins_10 += 1
+            losses_run = 0 if win else losses_run + 1
+
+        count_10 = min(count_30, 10)
+        volatility = 0.0
+        if count_30 >= 5:
+            mean = total_30 / count_30
+            volatility = math.sqrt(max(0.0, total_sq_30 / count_30 - mean * mean))
+
+        return {
+            'win_rate': (wins_30 / count_30 * 100) if count_30 else 0.0,
+            'recent_win_rate': (wins_10 / count_10 * 100) if count_10 else 0.0,
+            'volatility': volatility,
+            'consecutive_losses': losses_run
         }
 
     def recommend_profile(self, model_id: int) -> Dict:
@@ -335,8 +415,8 @@ class MarketAnalyzer:
         Analyze how suitable each profile is for current conditions
         Returns suitability scores (0-100) for all profiles
         """
-        recommendation = self.recommend_profile(model_id)
-        metrics = recommendation['metrics']
+        # Only the metrics are needed, not the full recommendation
+        metrics = self.get_market_metrics(model_id)
 
         suitability = {}
 
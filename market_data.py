@@ -12,6 +12,7 @@ class MarketDataFetcher:
         self.binance_base_url = "https://api.binance.com/api/v3"
         self.coingecko_base_url = "https://api.coingecko.com/api/v3"
         self.db = db  # Database instance for storing price snapshots
+        self.session = requests.Session()  # Keep-alive across requests
         
         # Binance symbol mapping
         self.binance_symbols = {
@@ -36,6 +37,8 @@ class MarketDataFetcher:
         self._cache = {}
         self._cache_time = {}
         self._cache_duration = 5  # Cache for 5 seconds
+        # 14-day CoinGecko history is hourly, so indicators only move once per bar
+        self._indicator_cache_duration = 300
     
     def get_current_prices(self, coins: List[str]) -> Dict[str, float]:
         """Get current prices from Binance API"""
@@ -55,7 +58,7 @@ class MarketDataFetcher:
                 # Build symbols parameter
                 symbols_param = '[' + ','.join([f'"{s}"' for s in symbols]) + ']'
                 
-                response = requests.get(
+                response = self.session.get(
                     f"{self.binance_base_url}/ticker/24hr",
                     params={'symbols': symbols_param},
                     timeout=5
@@ -82,8 +85,9 @@ class MarketDataFetcher:
             # Store price snapshots for benchmark calculations
             if self.db:
                 try:
-                    for coin, data in prices.items():
-                        self.db.store_price_snapshot(coin, data['price'])
+                    self.db.store_price_snapshots(
+                        [(coin, data['price']) for coin, data in prices.items()]
+                    )
                 except Exception as e:
                     print(f"[WARNING] Failed to store price snapshot: {e}")
 
@@ -99,7 +103,7 @@ class MarketDataFetcher:
         try:
             coin_ids = [self.coingecko_mapping.get(coin, coin.lower()) for coin in coins]
             
-            response = requests.get(
+            response = self.session.get(
                 f"{self.coingecko_base_url}/simple/price",
                 params={
                     'ids': ','.join(coin_ids),
@@ -130,7 +134,7 @@ class MarketDataFetcher:
         coin_id = self.coingecko_mapping.get(coin, coin.lower())
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.coingecko_base_url}/coins/{coin_id}",
                 params={'localization': 'false', 'tickers': 'false', 'community_data': 'false'},
                 timeout=10
@@ -158,7 +162,7 @@ class MarketDataFetcher:
         coin_id = self.coingecko_mapping.get(coin, coin.lower())
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.coingecko_base_url}/coins/{coin_id}/market_chart",
                 params={'vs_currency': 'usd', 'days': days},
                 timeout=10
@@ -180,6 +184,11 @@ class MarketDataFetcher:
     
     def calculate_technical_indicators(self, coin: str) -> Dict:
         """Calculate technical indicators"""
+        cache_key = 'indicators_' + coin
+        if cache_key in self._cache:
+            if time.time() - self._cache_time[cache_key] < self._indicator_cache_duration:
+                return self._cache[cache_key]
+        
         historical = self.get_historical_prices(coin, days=14)
         
         if not historical or len(historical) < 14:
@@ -188,16 +197,14 @@ class MarketDataFetcher:
         prices = [p['price'] for p in historical]
         
         # Simple Moving Average
-        sma_7 = sum(prices[-7:]) / 7 if len(prices) >= 7 else prices[-1]
-        sma_14 = sum(prices[-14:]) / 14 if len(prices) >= 14 else prices[-1]
+        sma_7 = sum(prices[-7:]) / 7
+        sma_14 = sum(prices[-14:]) / 14
         
-        # Simple RSI calculation
-        changes = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [c if c > 0 else 0 for c in changes]
-        losses = [-c if c < 0 else 0 for c in changes]
-        
-        avg_gain = sum(gains[-14:]) / 14 if gains else 0
-        avg_loss = sum(losses[-14:]) / 14 if losses else 0
+        # Simple RSI calculation over the last 14 changes only
+        window = prices[-15:]
+        changes = [b - a for a, b in zip(window, window[1:])]
+        avg_gain = sum(c for c in changes if c > 0) / 14
+        avg_loss = sum(-c for c in changes if c < 0) / 14
         
         if avg_loss == 0:
             rsi = 100
@@ -205,11 +212,13 @@ class MarketDataFetcher:
             rs = avg_gain / avg_loss
             rsi = 100 - (100 / (1 + rs))
         
-        return {
+        indicators = {
             'sma_7': sma_7,
             'sma_14': sma_14,
             'rsi_14': rsi,
             'current_price': prices[-1],
             'price_change_7d': ((prices[-1] - prices[0]) / prices[0]) * 100 if prices[0] > 0 else 0
         }
-
+        self._cache[cache_key] = indicators
+        self._cache_time[cache_key] = time.time()
+        return indicators
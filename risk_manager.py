@@ -30,9 +30,86 @@ class RiskManager:
         Returns:
             (is_valid, reason) - True if trade passes all checks
         """
-        settings = self.db.get_model_settings(model_id)
-        portfolio = self.db.get_portfolio(model_id, {coin: market_data})
-        model = self.db.get_model(model_id)
+        context = self.load_context(model_id, {coin: market_data})
+        return self._validate(context, decision, market_data)
+
+    def validate_trades(self, model_id: int, decisions: Dict, market_data: Dict,
+                        context: Dict = None) -> Dict[str, Tuple[bool, str]]:
+        """
+        Validate several decisions for one model against the same risk state
+
+        Settings, portfolio and trade counts are loaded once for the batch.
+
+        Args:
+            model_id: Model ID
+            decisions: {coin: AI decision dict}
+            market_data: {coin: current market data}
+            context: Result of load_context() already read this cycle (optional)
+
+        Returns:
+            {coin: (is_valid, reason)}
+        """
+        if not decisions:
+            return {}
+
+        if context is None:
+            context = self.load_context(model_id, market_data)
+        # Account-level checks don't depend on the decision; run them once
+        account_checks = self._account_checks(context)
+        return {
+            coin: self._validate(context, decision, market_data.get(coin, {}),
+                                 account_checks)
+            for coin, decision in decisions.items()
+        }
+
+    def load_context(self, model_id: int, market_data: Dict, model: Dict = None) -> Dict:
+        """
+        Read everything the checks need for one model
+
+        The trading cycle loads this once and shares it with the automation
+        handlers and auto-pause checks; pass model to reuse a cached row.
+        """
+        prices = {coin: data['price'] for coin, data in market_data.items() if 'price' in data}
+        if model is None:
+            model = self.db.get_model(model_id)
+        config = self.db.get_model_bundle(model_id)
+
+        context = {
+            'model_id': model_id,
+            'settings': config['settings'],
+            'portfolio': self.db.get_portfolio(model_id, prices),
+            'model': model,
+            'automation': config['automation'],
+            'environment': config['environment'],
+            'trades_today': self._count_trades_today(model_id),
+        }
+        if context['automation'] == 'fully_automated':
+            context['peak_equity'] = self._get_peak_equity(model_id, model['initial_capital'])
+        return context
+
+    def _account_checks(self, context: Dict) -> Dict[str, Tuple[bool, str]]:
+        """Results of the checks that only look at the account, not the trade"""
+        settings = context['settings']
+        portfolio = context['portfolio']
+        checks = {
+            'daily_loss': self._check_daily_loss_limit(settings, context['model'], portfolio),
+            'daily_trades': self._check_daily_trade_limit(settings, context['trades_today']),
+            'drawdown': (True, ""),
+        }
+        if context['automation'] == 'fully_automated':
+            checks['drawdown'] = self._check_max_drawdown(
+                settings, context['peak_equity'], portfolio
+            )
+        return checks
+
+    def _validate(self, context: Dict, decision: Dict, market_data: Dict,
+                  account_checks: Dict = None) -> Tuple[bool, str]:
+        """Run every check for one decision against a loaded context
+
+        account_checks is _account_checks(context), shared across a batch.
+        """
+        settings = context['settings']
+        portfolio = context['portfolio']
 
         signal = decision.get('signal', 'hold')
         quantity = decision.get('quantity', 0)
@@ -42,6 +119,9 @@ class RiskManager:
         if signal == 'hold':
             return True, "Hold signal"
 
+        if account_checks is None:
+            account_checks = self._account_checks(context)
+
         # Check 1: Max position size
         is_valid, reason = self._check_position_size(
             settings, portfolio, quantity, price
@@ -50,16 +130,12 @@ class RiskManager:
             return False, reason
 
         # Check 2: Daily loss limit (circuit breaker)
-        is_valid, reason = self._check_daily_loss_limit(
-            settings, model, portfolio
-        )
+        is_valid, reason = account_checks['daily_loss']
         if not is_valid:
             return False, reason
 
         # Check 3: Max daily trades
-        is_valid, reason = self._check_daily_trade_limit(
-            settings, model_id
-        )
+        is_valid, reason = account_checks['daily_trades']
         if not is_valid:
             return False, reason
 
@@ -78,17 +154,12 @@ class RiskManager:
             return False, reason
 
         # Check 6: Max drawdown (for full auto mode only)
-        automation = self.db.get_automation_level(model_id)
-        if automation == 'fully_automated':
-            is_valid, reason = self._check_max_drawdown(
-                settings, model_id, model, portfolio
-            )
-            if not is_valid:
-                return False, reason
+        is_valid, reason = account_checks['drawdown']
+        if not is_valid:
+            return False, reason
 
         # Check 7: Live trading specific checks
-        environment = self.db.get_trading_environment(model_id)
-        if environment == 'live':
+        if context['environment'] == 'live':
             # Additional live trading validations can go here
             # For now, we use the same checks
             pass
@@ -122,10 +193,8 @@ class RiskManager:
 
         return True, ""
 
-    def _check_daily_trade_limit(self, settings: Dict, model_id: int) -> Tuple[bool, str]:
+    def _check_daily_trade_limit(self, settings: Dict, trades_today: int) -> Tuple[bool, str]:
         """Check if daily trade limit exceeded"""
-        # Count trades today
-        trades_today = self._count_trades_today(model_id)
         max_trades = settings.get('max_daily_trades', 20)
 
         if trades_today >= max_trades:
@@ -166,12 +235,9 @@ class RiskManager:
 
         return True, ""
 
-    def _check_max_drawdown(self, settings: Dict, model_id: int, model: Dict,
+    def _check_max_drawdown(self, settings: Dict, peak_equity: float,
                            portfolio: Dict) -> Tuple[bool, str]:
         """Check if max drawdown exceeded (full auto only)"""
-        # Get peak equity (highest total_value ever reached)
-        peak_equity = self._get_peak_equity(model_id, model['initial_capital'])
-
         current_value = portfolio['total_value']
         drawdown_pct = ((current_value - peak_equity) / peak_equity) * 100
 
@@ -31,6 +31,8 @@ def update_graduation_settings_api():
         settings = request.json
         db.update_graduation_settings(settings)
         return jsonify({'success': True})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -52,6 +54,8 @@ def update_benchmark_settings_api():
         settings = request.json
         db.update_benchmark_settings(settings)
         return jsonify({'success': True})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -73,6 +77,8 @@ def update_cost_tracking_settings_api():
         settings = request.json
         db.update_cost_tracking_settings(settings)
         return jsonify({'success': True})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -99,9 +105,12 @@ def get_model_graduation_status(model_id):
             conn.close()
             return jsonify({'error': 'Model not found'}), 404
 
-        # Get trades count and first trade date (exclude 'hold' signals)
+        # Trade statistics in one pass inside SQLite (exclude 'hold' signals):
+        # count, first trade date, wins, and mean / mean-square of pnl for Sharpe
         cursor.execute('''
-            SELECT COUNT(*) as count, MIN(timestamp) as first_trade
+            SELECT COUNT(*) as count, MIN(timestamp) as first_trade,
+                   COUNT(CASE WHEN pnl > 0 THEN 1 END) as wins,
+                   AVG(pnl) as avg_pnl, AVG(pnl * pnl) as avg_pnl_sq
             FROM trades WHERE model_id = ? AND signal != 'hold'
         ''', (model_id,))
         trade_info = cursor.fetchone()
@@ -117,45 +126,26 @@ def get_model_graduation_status(model_id):
             testing_days = time_delta.days
             testing_minutes = int(time_delta.total_seconds() / 60)
 
-        # Get win rate (exclude 'hold' signals)
-        cursor.execute('''
-            SELECT
-                COUNT(CASE WHEN pnl > 0 THEN 1 END) as wins,
-                COUNT(*) as total
-            FROM trades WHERE model_id = ? AND signal != 'hold'
-        ''', (model_id,))
-        win_data = cursor.fetchone()
-        win_rate = (win_data['wins'] / win_data['total'] * 100) if win_data['total'] > 0 else 0
-
-        # Calculate Sharpe ratio (simplified - using trade returns, exclude 'hold' signals)
-        cursor.execute('''
-            SELECT pnl FROM trades WHERE model_id = ? AND signal != 'hold' ORDER BY timestamp
-        ''', (model_id,))
-        trades = cursor.fetchall()
+        win_rate = (trade_info['wins'] / total_trades * 100) if total_trades > 0 else 0
 
+        # Calculate Sharpe ratio (simplified - using trade returns, population std)
         sharpe_ratio = 0
-        if len(trades) > 1:
-            returns = [t['pnl'] for t in trades]
-            avg_return = sum(returns) / len(returns)
-            std_return = math.sqrt(sum([(r - avg_return)**2 for r in returns]) / len(returns))
+        if total_trades > 1:
+            avg_return = trade_info['avg_pnl']
+            variance = max(0.0, trade_info['avg_pnl_sq'] - avg_return ** 2)
+            std_return = math.sqrt(variance)
             sharpe_ratio = (avg_return / std_return) if std_return > 0 else 0
 
-        # Calculate max drawdown
+        # Calculate max drawdown against the running peak
         cursor.execute('''
-            SELECT total_value, timestamp FROM account_values
-            WHERE model_id = ? ORDER BY timestamp
+            SELECT COALESCE(MAX(CASE WHEN peak > 0 THEN (peak - total_value) / peak * 100 ELSE 0 END), 0)
+            FROM (
+                SELECT total_value,
+                       MAX(total_value) OVER (ORDER BY timestamp ROWS UNBOUNDED PRECEDING) as peak
+                FROM account_values WHERE model_id = ?
+            )
         ''', (model_id,))
-        account_values = cursor.fetchall()
-
-        max_drawdown = 0
-        if len(account_values) > 0:
-            peak = account_values[0]['total_value']
-            for av in account_values:
-                if av['total_value'] > peak:
-                    peak = av['total_value']
-                drawdown = ((peak - av['total_value']) / peak * 100) if peak > 0 else 0
-                if drawdown > max_drawdown:
-                    max_drawdown = drawdown
+        max_drawdown = max(0, cursor.fetchone()[0])
 
         conn.close()
 
@@ -24,8 +24,16 @@ models_bp = Blueprint('models', __name__)
 @models_bp.route('/api/models', methods=['GET'])
 def get_models():
     db = app_context['db']
+
+    # Unchanged list -> 304 before the models are even read
+    etag = db.get_models_revision()
+    if etag in request.if_none_match:
+        return '', 304, {'ETag': f'"{etag}"'}
+
     models = db.get_all_models()
-    return jsonify(models)
+    response = jsonify(models)
+    response.set_etag(etag)
+    return response
 
 
 @models_bp.route('/api/models', methods=['POST'])
@@ -891,15 +899,17 @@ def trading_loop():
                 time.sleep(30)
                 continue
 
+            # One timestamp for every model run in this tick
+            now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             print(f"\n{'='*60}")
-            print(f"[CYCLE] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            print(f"[CYCLE] {now_str}")
             print(f"[INFO] Active models: {len(trading_engines)}")
             print(f"{'='*60}")
 
             for model_id, engine in list(trading_engines.items()):
                 try:
                     print(f"\n[EXEC] Model {model_id}")
-                    result = engine.execute_trading_cycle()
+                    result = engine.execute_trading_cycle(now_str)
 
                     if result.get('success'):
                         print(f"[OK] Model {model_id} completed")
@@ -915,7 +925,7 @@ def trading_loop():
                                 if 'error' in exec_result:
                                     print(f"  [ERROR] {coin}: {exec_result['error']}")
                                 elif signal != 'hold':
-                                    msg = exec_result.get('message', '')
+                                    msg = TradingEngine.describe_result(exec_result)
                                     print(f"  [TRADE] {coin}: {msg}")
                     else:
                         error = result.get('error', 'Unknown error')
@@ -47,7 +47,8 @@ def init_enhanced_components(model_id):
             db=enhanced_db,
             risk_manager=risk_managers[model_id],
             notifier=notifiers[model_id],
-            explainer=explainers[model_id]
+            explainer=explainers[model_id],
+            market_fetcher=app_context['market_fetcher']
         )
 
 
@@ -66,6 +67,20 @@ def get_model_incidents(model_id):
         return jsonify({'error': str(e)}), 500
 
 
+@monitoring_bp.route('/api/models/<int:model_id>/incidents/summary', methods=['GET'])
+def get_model_incident_summary(model_id):
+    """Get incident counts per type for a model (?types=A,B to filter)"""
+    enhanced_db = app_context['enhanced_db']
+
+    try:
+        types = request.args.get('types', '')
+        incident_types = [t for t in types.split(',') if t] or None
+        counts = enhanced_db.get_incident_counts(model_id=model_id, incident_types=incident_types)
+        return jsonify(counts)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @monitoring_bp.route('/api/incidents', methods=['GET'])
 def get_all_incidents():
     """Get all incidents across all models"""
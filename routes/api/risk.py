@@ -242,14 +242,14 @@ def apply_risk_profile(model_id):
         if not profile_id:
             return jsonify({'error': 'profile_id is required'}), 400
 
-        enhanced_db.apply_risk_profile(model_id, profile_id)
-
-        profile = enhanced_db.get_risk_profile(profile_id)
+        # Applied and read back in one transaction
+        active_profile = enhanced_db.apply_risk_profile(model_id, profile_id)
 
         return jsonify({
             'success': True,
-            'message': f'Profile "{profile["name"]}" applied successfully',
-            'profile': profile
+            'message': f'Profile "{active_profile["name"]}" applied successfully',
+            'profile': active_profile,
+            'active_profile': active_profile
         })
     except ValueError as e:
         return jsonify({'error': str(e)}), 404
@@ -411,20 +411,15 @@ def get_profile_suitability(model_id):
         analyzer = MarketAnalyzer(enhanced_db)
         suitability = analyzer.get_profile_suitability(model_id)
 
-        # Get all profiles with their suitability scores
-        all_profiles = enhanced_db.get_all_risk_profiles()
-
-        profiles_with_scores = []
-        for profile in all_profiles:
-            if profile['name'] in suitability:
-                profiles_with_scores.append({
-                    'id': profile['id'],
-                    'name': profile['name'],
-                    'icon': profile['icon'],
-                    'description': profile['description'],
-                    'suitability_score': suitability[profile['name']],
-                    'suitability_label': _get_suitability_label(suitability[profile['name']])
-                })
+        # Fetch only the scored profiles in one query
+        profiles_with_scores = [
+            {
+                **profile,
+                'suitability_score': suitability[profile['name']],
+                'suitability_label': _get_suitability_label(suitability[profile['name']])
+            }
+            for profile in enhanced_db.get_risk_profiles_by_name(list(suitability))
+        ]
 
         # Sort by suitability score
         profiles_with_scores.sort(key=lambda x: x['suitability_score'], reverse=True)
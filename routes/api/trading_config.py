@@ -50,10 +50,18 @@ def init_enhanced_components(model_id):
             db=enhanced_db,
             risk_manager=risk_managers[model_id],
             notifier=notifiers[model_id],
-            explainer=explainers[model_id]
+            explainer=explainers[model_id],
+            market_fetcher=app_context['market_fetcher']
         )
 
 
+def invalidate_live_executor(model_id):
+    """Make the model's executor rebuild its exchange client on next use"""
+    executor = app_context['trading_executors'].get(model_id)
+    if executor:
+        executor.invalidate_live_executor(model_id)
+
+
 # -------- Trading Mode Management --------
 
 @trading_config_bp.route('/api/models/<int:model_id>/mode', methods=['GET'])
@@ -162,12 +170,55 @@ def get_model_config(model_id):
     """Get complete model configuration (environment + automation + exchange)"""
     try:
         enhanced_db = app_context['enhanced_db']
-        config = {
-            'environment': enhanced_db.get_trading_environment(model_id),
-            'automation': enhanced_db.get_automation_level(model_id),
-            'exchange_environment': enhanced_db.get_exchange_environment(model_id)
-        }
-        return jsonify(config)
+        config = enhanced_db.get_trading_config(model_id)
+
+        # The three settings identify the payload; unchanged -> 304 without a body
+        etag = '-'.join(config.values())
+        if etag in request.if_none_match:
+            return '', 304, {'ETag': f'"{etag}"'}
+
+        response = jsonify(config)
+        response.set_etag(etag)
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@trading_config_bp.route('/api/models/<int:model_id>/config', methods=['POST'])
+def set_model_config(model_id):
+    """Set environment and/or automation level in one transaction"""
+    try:
+        enhanced_db = app_context['enhanced_db']
+        data = request.json or {}
+        environment = data.get('environment')
+        automation = data.get('automation')
+
+        if environment is None and automation is None:
+            return jsonify({'error': 'Provide "environment" and/or "automation"'}), 400
+        if environment is not None and environment not in ['simulation', 'live']:
+            return jsonify({'error': 'Invalid environment. Must be "simulation" or "live"'}), 400
+        if automation is not None and automation not in ['manual', 'semi_automated', 'fully_automated']:
+            return jsonify({'error': 'Invalid automation level'}), 400
+
+        enhanced_db.set_trading_config(model_id, environment, automation)
+
+        config = enhanced_db.get_trading_config(model_id)
+        return jsonify({'success': True, **config})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@trading_config_bp.route('/api/models/<int:model_id>/state', methods=['GET'])
+def get_model_state(model_id):
+    """Get config, legacy mode and active risk profile in one payload"""
+    try:
+        enhanced_db = app_context['enhanced_db']
+        state = enhanced_db.get_trading_config(model_id)
+        state['mode'] = enhanced_db.legacy_mode(state['environment'], state['automation'])
+
+        settings = enhanced_db.get_model_settings(model_id)
+        profile_id = settings.get('active_profile_id')
+        state['active_profile'] = enhanced_db.get_risk_profile(profile_id) if profile_id else None
+
+        return jsonify(state)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -263,6 +314,7 @@ def set_exchange_credentials(model_id):
             testnet_api_secret=testnet_api_secret,
             exchange_type=exchange_type
         )
+        invalidate_live_executor(model_id)
 
         return jsonify({
             'success': True,
@@ -277,6 +329,7 @@ def delete_exchange_credentials(model_id):
     try:
         enhanced_db = app_context['enhanced_db']
         enhanced_db.delete_exchange_credentials(model_id)
+        invalidate_live_executor(model_id)
 
         return jsonify({
             'success': True,
@@ -321,6 +374,7 @@ def set_exchange_environment(model_id):
             return jsonify({'error': 'Invalid exchange environment. Must be "testnet" or "mainnet"'}), 400
 
         enhanced_db.set_exchange_environment(model_id, exchange_env)
+        invalidate_live_executor(model_id)
 
         return jsonify({
             'success': True,
@@ -420,10 +474,9 @@ def approve_pending_decision(decision_id):
         modifications = data.get('modifications', None)
 
         # Initialize components if needed
-        decisions = enhanced_db.get_pending_decisions(model_id=None, status='pending')
-        decision = next((d for d in decisions if d['id'] == decision_id), None)
+        decision = enhanced_db.get_pending_decision(decision_id)
 
-        if not decision:
+        if not decision or decision['status'] != 'pending':
             return jsonify({'error': 'Decision not found'}), 404
 
         model_id = decision['model_id']
@@ -433,7 +486,8 @@ def approve_pending_decision(decision_id):
         result = trading_executors[model_id].approve_decision(
             decision_id=decision_id,
             modified=modified,
-            modifications=modifications
+            modifications=modifications,
+            decision_data=decision
         )
 
         return jsonify(result)
@@ -451,10 +505,9 @@ def reject_pending_decision(decision_id):
         reason = data.get('reason', 'User rejected')
 
         # Initialize components if needed
-        decisions = enhanced_db.get_pending_decisions(model_id=None, status='pending')
-        decision = next((d for d in decisions if d['id'] == decision_id), None)
+        decision = enhanced_db.get_pending_decision(decision_id)
 
-        if not decision:
+        if not decision or decision['status'] != 'pending':
             return jsonify({'error': 'Decision not found'}), 404
 
         model_id = decision['model_id']
@@ -463,7 +516,8 @@ def reject_pending_decision(decision_id):
         # Execute rejection
         result = trading_executors[model_id].reject_decision(
             decision_id=decision_id,
-            reason=reason
+            reason=reason,
+            decision_data=decision
         )
 
         return jsonify(result)
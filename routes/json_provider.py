@@ -0,0 +1,40 @@
+"""
+Flask JSON provider backed by orjson when it is installed.
+Falls back to Flask's default provider otherwise.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize jsonify() responses with orjson
+
+    Keys, sorting and Flask's default() for dates, decimals and dataclasses
+    behave as with the stdlib provider, with two differences in the output:
+
+    - non-finite floats (NaN, Infinity) are written as null, not as the
+      NaN/Infinity tokens, which are not valid JSON anyway;
+    - non-ASCII text is written as UTF-8 rather than \\uXXXX escapes,
+      whatever ensure_ascii says.
+    """
+
+    def dumps(self, obj, **kwargs):
+        # orjson only emits compact output; indented (debug) dumps use json
+        if orjson is None or kwargs not in ({}, {'separators': (',', ':')}):
+            return super().dumps(obj, **kwargs)
+
+        # Dates/decimals/dataclasses go through Flask's default() as before
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Database maintenance: VACUUM + ANALYZE + PRAGMA optimize
+
+Run occasionally (e.g. before a test run), not on every start.
+"""
+
+import sys
+import os
+# Add parent directory to path so we can import from root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Database
+
+db_path = sys.argv[1] if len(sys.argv) > 1 else 'AITradeGame.db'
+
+print(f"Optimizing {db_path}...")
+size_before = os.path.getsize(db_path)
+Database(db_path).vacuum_and_analyze()
+size_after = os.path.getsize(db_path)
+print(f"✓ Done ({size_before / 1024:.0f} KB -> {size_after / 1024:.0f} KB)")
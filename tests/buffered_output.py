@@ -0,0 +1,37 @@
+"""
+Thread-aware stdout buffering for the script-style test suites
+"""
+import threading
+from contextlib import contextmanager
+
+
+class BufferedStdout:
+    """stdout proxy that collects a thread's output and writes it in one go"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def write(self, text):
+        buf = getattr(self._local, 'buf', None)
+        if buf is None:
+            return self.stream.write(text)
+        buf.append(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(self._local, 'buf', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @contextmanager
+    def buffered(self):
+        self._local.buf = []
+        try:
+            yield
+        finally:
+            buf, self._local.buf = self._local.buf, None
+            self.stream.write(''.join(buf))
+            self.stream.flush()
@@ -0,0 +1,9 @@
+"""
+Shared pytest configuration for the test scripts
+"""
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "serial: changes shared server state; run after the parallel tests, in order"
+    )
@@ -0,0 +1,67 @@
+"""
+Shared HTTP helpers for the test scripts: the session setup, response
+decoding (orjson when installed), ETag-revalidated GETs and waiting for
+the server
+"""
+import atexit
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def make_session():
+    """Keep-alive session for one test run, closed at exit
+
+    Idempotent requests are retried through the transient 5xx of a server
+    still warming up, the same way in every suite.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(
+        pool_connections=1, pool_maxsize=10,
+        max_retries=Retry(total=3, backoff_factor=0.1, status_forcelist=(502, 503, 504)),
+    ))
+    atexit.register(session.close)
+    return session
+
+try:
+    import orjson
+
+    def response_json(response):
+        """Decode a requests response body"""
+        return orjson.loads(response.content)
+except ImportError:
+    def response_json(response):
+        """Decode a requests response body"""
+        return response.json()
+
+# url -> (etag, decoded body)
+_etag_cache = {}
+
+def cached_get(session, url, **kwargs):
+    """GET and decode url, revalidating an earlier response with If-None-Match"""
+    cached = _etag_cache.get(url)
+    headers = dict(kwargs.pop('headers', None) or {})
+    if cached:
+        headers['If-None-Match'] = cached[0]
+
+    r = session.get(url, headers=headers, **kwargs)
+    if r.status_code == 304 and cached:
+        return cached[1]
+
+    r.raise_for_status()
+    data = response_json(r)
+    if 'ETag' in r.headers:
+        _etag_cache[url] = (r.headers['ETag'], data)
+    return data
+
+def wait_ready(session, url, timeout=30):
+    """Poll url until it answers (priming the keep-alive pool); False on timeout"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if session.get(url, timeout=1).status_code == 200:
+                return True
+        except requests.exceptions.ConnectionError:
+            pass
+        time.sleep(0.2)
+    return False
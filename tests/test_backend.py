@@ -2,19 +2,34 @@
 """
 Backend Testing Script for Graduation & Benchmark Features
 """
+import os
 import sys
 import json
+import sqlite3
+import tempfile
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from database import Database
-from market_data import MarketDataFetcher
+from buffered_output import BufferedStdout
 
-def test_database_schema():
+_db = None
+
+def get_db():
+    """Shared Database for the whole suite (one persistent connection)"""
+    global _db
+    if _db is None:
+        _db = Database('AITradeGame.db', persistent=True)
+    return _db
+
+def test_database_schema(db=None):
     """Test 1: Database schema initialization"""
     print("\n" + "="*60)
     print("TEST 1: Database Schema Initialization")
     print("="*60)
 
     try:
-        db = Database('AITradeGame.db')
+        db = db or get_db()
         db.init_db()
         print("✅ Database initialized successfully")
 
@@ -30,15 +45,20 @@ def test_database_schema():
             'ai_costs'
         ]
 
+        placeholders = ','.join('?' * len(tables))
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE type='table' AND name IN ({placeholders})",
+            tables
+        )
+        found = {row['name'] for row in cursor.fetchall()}
+
         for table in tables:
-            cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
-            if cursor.fetchone():
+            if table in found:
                 print(f"  ✅ Table '{table}' exists")
             else:
                 print(f"  ❌ Table '{table}' missing")
                 return False
 
-        conn.close()
         print("✅ All tables created successfully\n")
         return True
 
@@ -46,14 +66,14 @@ def test_database_schema():
         print(f"❌ Database initialization failed: {e}\n")
         return False
 
-def test_graduation_settings():
+def test_graduation_settings(db=None):
     """Test 2: Graduation settings CRUD"""
     print("\n" + "="*60)
     print("TEST 2: Graduation Settings API")
     print("="*60)
 
     try:
-        db = Database('AITradeGame.db')
+        db = db or get_db()
 
         # Test GET (should have defaults)
         settings = db.get_graduation_settings()
@@ -83,6 +103,14 @@ def test_graduation_settings():
             print(f"❌ Settings not updated: {updated}")
             return False
 
+        # Misspelled keys are rejected, not silently dropped
+        try:
+            db.update_graduation_settings({'min_trade': 10})
+            print("❌ Unknown setting was accepted")
+            return False
+        except ValueError as e:
+            print(f"✅ Unknown setting rejected: {e}")
+
         # Reset to defaults
         db.update_graduation_settings({'strategy_preset': 'quick_test', 'min_trades': 20})
         print("✅ Settings reset to defaults\n")
@@ -92,14 +120,14 @@ def test_graduation_settings():
         print(f"❌ Graduation settings test failed: {e}\n")
         return False
 
-def test_benchmark_settings():
+def test_benchmark_settings(db=None):
     """Test 3: Benchmark settings CRUD"""
     print("\n" + "="*60)
     print("TEST 3: Benchmark Settings API")
     print("="*60)
 
     try:
-        db = Database('AITradeGame.db')
+        db = db or get_db()
 
         # Test GET
         settings = db.get_benchmark_settings()
@@ -127,14 +155,14 @@ def test_benchmark_settings():
         print(f"❌ Benchmark settings test failed: {e}\n")
         return False
 
-def test_price_snapshots():
+def test_price_snapshots(db=None):
     """Test 4: Price snapshot storage"""
     print("\n" + "="*60)
     print("TEST 4: Price Snapshot Storage")
     print("="*60)
 
     try:
-        db = Database('AITradeGame.db')
+        db = db or get_db()
 
         # Store test snapshots
         test_prices = {
@@ -143,18 +171,30 @@ def test_price_snapshots():
             'SOL': 98.25
         }
 
-        for coin, price in test_prices.items():
-            db.store_price_snapshot(coin, price)
+        with db.transaction():
+            db.store_price_snapshots(list(test_prices.items()))
 
         print("✅ Stored 3 test price snapshots")
 
         # Verify storage
         conn = db.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) as count FROM price_snapshots')
-        count = cursor.fetchone()['count']
+        cursor.execute('SELECT COUNT(*) FROM price_snapshots')
+        count = cursor.fetchone()[0]
         print(f"✅ Total snapshots in database: {count}")
 
+        # Earliest-snapshot lookup must use the (coin, timestamp) index
+        cursor.execute('''
+            EXPLAIN QUERY PLAN SELECT price, timestamp FROM price_snapshots
+            WHERE coin = ? ORDER BY timestamp ASC LIMIT 1
+        ''', ('BTC',))
+        plan = ' '.join(row['detail'] for row in cursor.fetchall())
+        if 'idx_coin_timestamp' in plan:
+            print("✅ Snapshot lookup uses idx_coin_timestamp")
+        else:
+            print(f"❌ Snapshot lookup does not use index: {plan}")
+            return False
+
         # Test retrieval
         btc_snapshot = db.get_earliest_price_snapshot('BTC')
         if btc_snapshot:
@@ -162,7 +202,6 @@ def test_price_snapshots():
         else:
             print("⚠️  No BTC snapshot found")
 
-        conn.close()
         print("✅ Price snapshot storage working\n")
         return True
 
@@ -170,40 +209,55 @@ def test_price_snapshots():
         print(f"❌ Price snapshot test failed: {e}\n")
         return False
 
-def test_ai_cost_tracking():
+def test_ai_cost_tracking(db=None):
     """Test 5: AI cost tracking"""
     print("\n" + "="*60)
     print("TEST 5: AI Cost Tracking")
     print("="*60)
 
     try:
-        db = Database('AITradeGame.db')
+        db = db or get_db()
 
         # Check if we have any models
-        models = db.get_all_models()
-        if not models:
+        model_id = db.get_first_model_id()
+        if model_id is None:
             print("⚠️  No models found - skipping cost tracking test")
             print("   (This is OK - create a model to test this feature)\n")
             return True
 
-        model_id = models[0]['id']
-
         # Store test costs
-        db.store_ai_cost(
-            model_id=model_id,
-            cost_type='trading_decision',
-            cost_usd=0.05,
-            tokens_used=1500,
-            provider='openai',
-            model_name='gpt-4-turbo'
-        )
+        with db.transaction():
+            db.store_ai_costs_batch([{
+                'model_id': model_id,
+                'cost_type': 'trading_decision',
+                'cost_usd': 0.05,
+                'tokens_used': 1500,
+                'provider': 'openai',
+                'model_name': 'gpt-4-turbo'
+            }])
 
         print(f"✅ Stored test AI cost for model {model_id}")
 
+        # Per-model cost queries must use the (model_id, timestamp) index
+        cursor = db.get_connection().cursor()
+        cursor.execute(
+            'EXPLAIN QUERY PLAN SELECT SUM(cost_usd) FROM ai_costs WHERE model_id = ?',
+            (model_id,)
+        )
+        plan = ' '.join(row['detail'] for row in cursor.fetchall())
+        if 'idx_ai_costs_model_timestamp' in plan:
+            print("✅ Cost lookup uses idx_ai_costs_model_timestamp")
+        else:
+            print(f"❌ Cost lookup does not use index: {plan}")
+            return False
+
         # Get total costs
         total = db.get_total_ai_costs(model_id)
         print(f"✅ Total AI costs for model {model_id}: ${total:.4f}")
 
+        tokens = db.get_total_tokens(model_id)
+        print(f"✅ Total tokens for model {model_id}: {tokens}")
+
         # Get detailed costs
         costs = db.get_ai_costs(model_id)
         print(f"✅ Retrieved {len(costs)} cost entries\n")
@@ -213,23 +267,25 @@ def test_ai_cost_tracking():
         print(f"❌ AI cost tracking test failed: {e}\n")
         return False
 
-def test_market_fetcher_integration():
+def test_market_fetcher_integration(db=None):
     """Test 6: Market fetcher with price snapshots"""
     print("\n" + "="*60)
     print("TEST 6: Market Fetcher Integration")
     print("="*60)
 
     try:
-        db = Database('AITradeGame.db')
+        # Imported here so schema-only runs don't load the HTTP stack
+        from market_data import MarketDataFetcher
+
+        db = db or get_db()
         fetcher = MarketDataFetcher(db=db)
 
         print("Fetching market prices (this will store snapshots)...")
         prices = fetcher.get_current_prices(['BTC', 'ETH', 'SOL'])
 
         if prices:
-            print("✅ Market prices fetched:")
-            for coin, data in prices.items():
-                print(f"  {coin}: ${data['price']:.2f} ({data['change_24h']:+.2f}%)")
+            lines = [f"  {coin}: ${data['price']:.2f} ({data['change_24h']:+.2f}%)" for coin, data in prices.items()]
+            print("✅ Market prices fetched:\n" + "\n".join(lines))
 
             # Check if snapshots were stored
             conn = db.get_connection()
@@ -239,12 +295,10 @@ def test_market_fetcher_integration():
                 ORDER BY timestamp DESC LIMIT 3
             ''')
             recent = cursor.fetchall()
-            conn.close()
 
             if recent:
-                print("✅ Latest snapshots stored:")
-                for row in recent:
-                    print(f"  {row['coin']}: ${row['price']:.2f} at {row['timestamp']}")
+                lines = [f"  {row['coin']}: ${row['price']:.2f} at {row['timestamp']}" for row in recent]
+                print("✅ Latest snapshots stored:\n" + "\n".join(lines))
             else:
                 print("⚠️  No snapshots found (may be using cache)")
 
@@ -258,30 +312,35 @@ def test_market_fetcher_integration():
         print(f"❌ Market fetcher test failed: {e}\n")
         return False
 
-def test_graduation_status_calculation():
+def test_graduation_status_calculation(db=None):
     """Test 7: Graduation status calculation (if models exist)"""
     print("\n" + "="*60)
     print("TEST 7: Graduation Status Calculation")
     print("="*60)
 
     try:
-        db = Database('AITradeGame.db')
+        db = db or get_db()
 
         # Check if we have models with trades
-        models = db.get_all_models()
-        if not models:
+        model_id = db.get_first_model_id()
+        if model_id is None:
             print("⚠️  No models found - skipping graduation status test")
             print("   (This is OK - create a model with trades to test)\n")
             return True
 
-        model_id = models[0]['id']
-
-        # Check if model has trades
         conn = db.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) as count FROM trades WHERE model_id = ?', (model_id,))
-        trade_count = cursor.fetchone()['count']
-        conn.close()
+
+        # Model lookup must walk the primary key, not sort the table
+        cursor.execute('EXPLAIN QUERY PLAN SELECT id FROM models ORDER BY id LIMIT 1')
+        plan = ' '.join(row['detail'] for row in cursor.fetchall())
+        if 'TEMP B-TREE' in plan:
+            print(f"❌ Model lookup sorts the table: {plan}")
+            return False
+
+        # Check if model has trades
+        cursor.execute('SELECT COUNT(*) FROM trades WHERE model_id = ?', (model_id,))
+        trade_count = cursor.fetchone()[0]
 
         if trade_count == 0:
             print(f"⚠️  Model {model_id} has no trades - skipping calculation")
@@ -299,51 +358,149 @@ def test_graduation_status_calculation():
         print(f"❌ Graduation status test failed: {e}\n")
         return False
 
-def main():
+def test_pending_decision_expiry_migration(db=None):
+    """Test 8: expires_at_ts backfill on a database created before the column existed"""
+    print("\n" + "="*60)
+    print("TEST 8: Pending Decision Expiry Migration")
+    print("="*60)
+
+    try:
+        # Imported here so schema-only runs don't load the trading stack
+        from database_enhanced import EnhancedDatabase
+        from trading_modes import TradingExecutor
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'legacy.db')
+
+            # pending_decisions as it was before expires_at_ts, with one
+            # well-formed, one malformed and one missing expiry
+            conn = sqlite3.connect(path)
+            conn.execute('''
+                CREATE TABLE pending_decisions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    model_id INTEGER NOT NULL,
+                    coin TEXT NOT NULL,
+                    decision_data TEXT NOT NULL,
+                    explanation_data TEXT,
+                    status TEXT DEFAULT 'pending',
+                    expires_at TIMESTAMP,
+                    rejection_reason TEXT,
+                    modified_data TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    resolved_at TIMESTAMP
+                )
+            ''')
+            conn.executemany(
+                'INSERT INTO pending_decisions (id, model_id, coin, decision_data, expires_at) VALUES (?, 1, ?, ?, ?)',
+                [(1, 'BTC', '{}', '2030-01-01 12:00:00'),
+                 (2, 'ETH', '{}', 'next tuesday'),
+                 (3, 'SOL', '{}', None)]
+            )
+            conn.commit()
+            conn.close()
+
+            legacy_db = EnhancedDatabase(path)
+            legacy_db.init_db()
+            print("✅ Legacy database migrated")
+
+            conn = legacy_db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, expires_at_ts FROM pending_decisions ORDER BY id')
+            backfilled = {row['id']: row['expires_at_ts'] for row in cursor.fetchall()}
+            conn.close()
+
+            expected = int(datetime.fromisoformat('2030-01-01 12:00:00').timestamp())
+            if backfilled != {1: expected, 2: None, 3: None}:
+                print(f"❌ Unexpected expires_at_ts values: {backfilled}")
+                return False
+            print("✅ Valid expiry backfilled, unparseable ones left NULL")
+
+            # A row without a usable expiry can't be approved
+            executor = TradingExecutor(legacy_db, None)
+            result = executor.approve_decision(2)
+            if result.get('error') != 'Decision expired':
+                print(f"❌ Decision without expiry was not treated as expired: {result}")
+                return False
+            print("✅ Decision without expiry treated as expired\n")
+            return True
+
+    except Exception as e:
+        print(f"❌ Expiry migration test failed: {e}\n")
+        return False
+
+def main(argv=None):
     """Run all tests"""
+    parser = argparse.ArgumentParser(description="Backend testing suite")
+    parser.add_argument('--only', choices=['schema'],
+                        help="run only the given test (schema: quick smoke check, no market imports)")
+    args = parser.parse_args(argv)
+
     print("\n" + "="*60)
     print("BACKEND TESTING SUITE")
     print("Testing Graduation & Benchmark Features")
     print("="*60)
 
+    # Schema must exist before anything else runs
+    setup = ("Database Schema", test_database_schema)
+
+    # Independent tests, network-bound one first so its latency overlaps
+    # the DB tests. Each worker thread gets its own connection from db.
     tests = [
-        ("Database Schema", test_database_schema),
+        ("Market Fetcher Integration", test_market_fetcher_integration),
         ("Graduation Settings", test_graduation_settings),
         ("Benchmark Settings", test_benchmark_settings),
         ("Price Snapshots", test_price_snapshots),
         ("AI Cost Tracking", test_ai_cost_tracking),
-        ("Market Fetcher Integration", test_market_fetcher_integration),
-        ("Graduation Status", test_graduation_status_calculation)
+        ("Graduation Status", test_graduation_status_calculation),
+        ("Expiry Migration", test_pending_decision_expiry_migration)
     ]
+    if args.only == 'schema':
+        tests = []
 
-    results = []
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            results.append((test_name, result))
-        except Exception as e:
-            print(f"❌ {test_name} crashed: {e}")
-            results.append((test_name, False))
+    db = get_db()
+
+    # Each test's output is written in one block so parallel tests don't interleave
+    out = BufferedStdout(sys.stdout)
+
+    def run(test_name, test_func):
+        with out.buffered():
+            try:
+                return test_name, test_func(db)
+            except Exception as e:
+                print(f"❌ {test_name} crashed: {e}")
+                return test_name, False
+
+    sys.stdout = out
+    try:
+        results = [run(*setup)]
+        if tests:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = [pool.submit(run, test_name, test_func) for test_name, test_func in tests]
+                results.extend(future.result() for future in futures)
+    finally:
+        sys.stdout = out.stream
 
     # Summary
     print("\n" + "="*60)
     print("TEST SUMMARY")
     print("="*60)
 
-    passed = sum(1 for _, result in results if result)
-    total = len(results)
-
+    passed, total, failures = 0, len(results), []
     for test_name, result in results:
-        status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{status}: {test_name}")
+        if result:
+            passed += 1
+            print(f"✅ PASS: {test_name}")
+        else:
+            failures.append(test_name)
+            print(f"❌ FAIL: {test_name}")
 
     print(f"\nTotal: {passed}/{total} tests passed")
 
-    if passed == total:
+    if not failures:
         print("\n🎉 All tests passed! Backend is ready for frontend integration.")
         return 0
     else:
-        print(f"\n⚠️  {total - passed} test(s) failed. Review errors above.")
+        print(f"\n⚠️  {len(failures)} test(s) failed: {', '.join(failures)}. Review errors above.")
         return 1
 
 if __name__ == '__main__':
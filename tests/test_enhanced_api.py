@@ -2,12 +2,17 @@
 Test script for Enhanced API endpoints
 Tests all new endpoints for the personal trading system
 """
-import requests
+import sys
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
+from buffered_output import BufferedStdout
+from json_response import make_session, wait_ready
 
 BASE_URL = "http://localhost:5000"
 
+# One keep-alive connection pool for every request in the run
+SESSION = make_session()
+
 def test_api():
     print("=" * 60)
     print("ENHANCED API TEST")
@@ -23,7 +28,7 @@ def test_api():
     }
 
     try:
-        r = requests.post(f"{BASE_URL}/api/providers", json=provider_data)
+        r = SESSION.post(f"{BASE_URL}/api/providers", json=provider_data)
         if r.status_code == 200:
             provider_id = r.json()['id']
             print(f"   ✓ Provider created: ID {provider_id}")
@@ -43,7 +48,7 @@ def test_api():
     }
 
     try:
-        r = requests.post(f"{BASE_URL}/api/models", json=model_data)
+        r = SESSION.post(f"{BASE_URL}/api/models", json=model_data)
         if r.status_code == 200:
             model_id = r.json()['id']
             print(f"   ✓ Model created: ID {model_id}")
@@ -61,7 +66,7 @@ def test_api():
 
     print("\n3. Getting current trading mode...")
     try:
-        r = requests.get(f"{BASE_URL}/api/models/{model_id}/mode")
+        r = SESSION.get(f"{BASE_URL}/api/models/{model_id}/mode")
         if r.status_code == 200:
             mode = r.json()['mode']
             print(f"   ✓ Current mode: {mode}")
@@ -72,7 +77,7 @@ def test_api():
 
     print("\n4. Setting mode to semi_automated...")
     try:
-        r = requests.post(f"{BASE_URL}/api/models/{model_id}/mode",
+        r = SESSION.post(f"{BASE_URL}/api/models/{model_id}/mode",
                          json={'mode': 'semi_automated'})
         if r.status_code == 200:
             print(f"   ✓ Mode changed to: {r.json()['mode']}")
@@ -88,7 +93,7 @@ def test_api():
 
     print("\n5. Getting model settings...")
     try:
-        r = requests.get(f"{BASE_URL}/api/models/{model_id}/settings")
+        r = SESSION.get(f"{BASE_URL}/api/models/{model_id}/settings")
         if r.status_code == 200:
             settings = r.json()
             print(f"   ✓ Settings retrieved")
@@ -107,7 +112,7 @@ def test_api():
             'max_daily_loss_pct': 5.0,
             'max_open_positions': 3
         }
-        r = requests.post(f"{BASE_URL}/api/models/{model_id}/settings",
+        r = SESSION.post(f"{BASE_URL}/api/models/{model_id}/settings",
                          json=new_settings)
         if r.status_code == 200:
             print(f"   ✓ Settings updated")
@@ -116,6 +121,18 @@ def test_api():
     except Exception as e:
         print(f"   ✗ Error: {e}")
 
+    # Steps 7-10 only read this model's state, so fetch them concurrently
+    # on the shared Session and report each result in order below
+    model_url = f"{BASE_URL}/api/models/{model_id}"
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pending = {
+            'risk': pool.submit(SESSION.get, f"{model_url}/risk-status"),
+            'readiness': pool.submit(SESSION.get, f"{model_url}/readiness"),
+            'incidents': pool.submit(SESSION.get, f"{model_url}/incidents"),
+            'decisions': pool.submit(SESSION.get, f"{BASE_URL}/api/pending-decisions",
+                                     params={'model_id': model_id}),
+        }
+
     # Test risk status
     print("\n" + "=" * 60)
     print("TESTING RISK STATUS")
@@ -123,7 +140,7 @@ def test_api():
 
     print("\n7. Getting risk status...")
     try:
-        r = requests.get(f"{BASE_URL}/api/models/{model_id}/risk-status")
+        r = pending['risk'].result()
         if r.status_code == 200:
             risk = r.json()
             print(f"   ✓ Risk status retrieved")
@@ -144,7 +161,7 @@ def test_api():
 
     print("\n8. Getting readiness assessment...")
     try:
-        r = requests.get(f"{BASE_URL}/api/models/{model_id}/readiness")
+        r = pending['readiness'].result()
         if r.status_code == 200:
             readiness = r.json()
             print(f"   ✓ Readiness assessed")
@@ -165,7 +182,7 @@ def test_api():
 
     print("\n9. Getting model incidents...")
     try:
-        r = requests.get(f"{BASE_URL}/api/models/{model_id}/incidents")
+        r = pending['incidents'].result()
         if r.status_code == 200:
             incidents = r.json()
             print(f"   ✓ Incidents retrieved: {len(incidents)} total")
@@ -186,7 +203,7 @@ def test_api():
 
     print("\n10. Getting pending decisions...")
     try:
-        r = requests.get(f"{BASE_URL}/api/pending-decisions?model_id={model_id}")
+        r = pending['decisions'].result()
         if r.status_code == 200:
             decisions = r.json()
             print(f"   ✓ Pending decisions retrieved: {len(decisions)} total")
@@ -203,11 +220,11 @@ def test_api():
     print("\n11. Testing emergency pause...")
     try:
         # First set to full auto
-        requests.post(f"{BASE_URL}/api/models/{model_id}/mode",
+        SESSION.post(f"{BASE_URL}/api/models/{model_id}/mode",
                      json={'mode': 'fully_automated'})
 
         # Then pause
-        r = requests.post(f"{BASE_URL}/api/models/{model_id}/pause",
+        r = SESSION.post(f"{BASE_URL}/api/models/{model_id}/pause",
                          json={'reason': 'Test emergency pause'})
         if r.status_code == 200:
             result = r.json()
@@ -226,7 +243,7 @@ def test_api():
 
     print("\n12. Deleting test model...")
     try:
-        r = requests.delete(f"{BASE_URL}/api/models/{model_id}")
+        r = SESSION.delete(f"{BASE_URL}/api/models/{model_id}")
         if r.status_code == 200:
             print(f"   ✓ Model deleted")
         else:
@@ -236,7 +253,7 @@ def test_api():
 
     print("\n13. Deleting test provider...")
     try:
-        r = requests.delete(f"{BASE_URL}/api/providers/{provider_id}")
+        r = SESSION.delete(f"{BASE_URL}/api/providers/{provider_id}")
         if r.status_code == 200:
             print(f"   ✓ Provider deleted")
         else:
@@ -249,8 +266,16 @@ def test_api():
     print("=" * 60)
 
 if __name__ == '__main__':
-    print("\nMake sure the Flask server is running (python app.py)")
-    print("Press Enter to start test...")
-    input()
+    print(f"\nWaiting for the Flask server on {BASE_URL} (python app.py)")
+    if not wait_ready(SESSION, f"{BASE_URL}/api/models"):
+        print(f"   ✗ Server did not become ready")
+        sys.exit(1)
 
-    test_api()
+    # Collect the run's output and write it in one block
+    out = BufferedStdout(sys.stdout)
+    sys.stdout = out
+    try:
+        with out.buffered():
+            test_api()
+    finally:
+        sys.stdout = out.stream
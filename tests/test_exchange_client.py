@@ -15,7 +15,8 @@ import os
 # Add parent directory to path so we can import from root
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from exchange_client import ExchangeClient
+from concurrent.futures import ThreadPoolExecutor
+from buffered_output import BufferedStdout
 import time
 
 # ============================================================
@@ -37,6 +38,9 @@ def test_connection():
     print("="*60)
 
     try:
+        # Imported here so the python-binance stack only loads when it is used
+        from exchange_client import ExchangeClient
+
         # Initialize client (testnet=True by default)
         client = ExchangeClient(
             api_key=TESTNET_API_KEY,
@@ -46,9 +50,12 @@ def test_connection():
 
         print(f"✅ Client initialized: {client}")
 
-        # Test ping
-        if client.ping():
-            print("✅ Exchange ping successful")
+        # Test ping (and measure REST round-trip latency)
+        t0 = time.monotonic_ns()
+        ping_ok = client.ping()
+        ping_ms = (time.monotonic_ns() - t0) / 1e6
+        if ping_ok:
+            print(f"✅ Exchange ping successful ({ping_ms:.1f} ms)")
         else:
             print("❌ Exchange ping failed")
             return None
@@ -72,9 +79,11 @@ def test_account_info(client):
         print(f"✅ Can Trade: {account['can_trade']}")
         print(f"✅ Permissions: {account['permissions']}")
 
-        print("\n📊 Balances:")
-        for asset, balance in account['balances'].items():
-            print(f"  {asset}: {balance['total']:.8f} (free: {balance['free']:.8f}, locked: {balance['locked']:.8f})")
+        lines = [
+            f"  {asset}: {balance['total']:.8f} (free: {balance['free']:.8f}, locked: {balance['locked']:.8f})"
+            for asset, balance in account['balances'].items()
+        ]
+        print("\n📊 Balances:\n" + "\n".join(lines))
 
         return True
 
@@ -193,15 +202,17 @@ def test_open_orders(client):
         if not orders:
             print("✅ No open orders")
         else:
-            print(f"✅ Found {len(orders)} open orders:")
-            for order in orders:
-                print(f"\n  Order ID: {order['order_id']}")
-                print(f"  Symbol: {order['symbol']}")
-                print(f"  Side: {order['side']}")
-                print(f"  Type: {order['type']}")
-                print(f"  Status: {order['status']}")
-                print(f"  Quantity: {order['quantity']}")
-                print(f"  Price: {order['price']}")
+            blocks = [
+                f"\n  Order ID: {order['order_id']}\n"
+                f"  Symbol: {order['symbol']}\n"
+                f"  Side: {order['side']}\n"
+                f"  Type: {order['type']}\n"
+                f"  Status: {order['status']}\n"
+                f"  Quantity: {order['quantity']}\n"
+                f"  Price: {order['price']}"
+                for order in orders
+            ]
+            print(f"✅ Found {len(orders)} open orders:\n" + "\n".join(blocks))
 
         # Get open orders for specific symbol
         symbol_orders = client.get_open_orders(SYMBOL)
@@ -262,24 +273,31 @@ def run_all_tests():
         print("\n❌ Connection failed - stopping tests")
         return
 
-    # Test 2: Account Info
-    test_account_info(client)
-
-    # Test 3: Market Data
-    test_market_data(client)
-
-    # Test 4: Balance
-    test_balance(client)
+    # Tests 2-4, 6, 7 are independent read-only calls: run them concurrently
+    # (each test's output is written in one block so they don't interleave)
+    read_only_tests = [
+        test_account_info,   # Test 2: Account Info
+        test_market_data,    # Test 3: Market Data
+        test_balance,        # Test 4: Balance
+        test_open_orders,    # Test 6: Open Orders
+        test_positions,      # Test 7: Positions
+    ]
+    out = BufferedStdout(sys.stdout)
+
+    def run(test_func):
+        with out.buffered():
+            return test_func(client)
+
+    sys.stdout = out
+    try:
+        with ThreadPoolExecutor(max_workers=len(read_only_tests)) as pool:
+            list(pool.map(run, read_only_tests))
+    finally:
+        sys.stdout = out.stream
 
     # Test 5: Test Orders
     test_order_placement(client)
 
-    # Test 6: Open Orders
-    test_open_orders(client)
-
-    # Test 7: Positions
-    test_positions(client)
-
     # Summary
     print("\n" + "="*60)
     print("✅ ALL TESTS COMPLETED")
@@ -0,0 +1,38 @@
+"""
+Output of the orjson-backed JSON provider against the stdlib one it replaces
+"""
+import math
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from routes.json_provider import OrjsonProvider
+
+pytest.importorskip('orjson')
+
+
+@pytest.fixture(scope='module')
+def providers():
+    app = Flask(__name__)
+    return OrjsonProvider(app), DefaultJSONProvider(app)
+
+
+# Plain values serialize the same as with the stdlib provider
+def test_matches_default_provider(providers):
+    orjson_provider, default_provider = providers
+    data = {'b': 1, 'a': [1.5, None, True], 'nested': {'x': 'y'}}
+    assert orjson_provider.loads(orjson_provider.dumps(data)) == data
+    assert orjson_provider.dumps(data) == default_provider.dumps(data, separators=(',', ':'))
+
+
+# Non-finite floats become null instead of the NaN/Infinity tokens
+def test_non_finite_floats_are_null(providers):
+    orjson_provider, default_provider = providers
+    data = {'pnl': math.nan, 'ratio': math.inf}
+    assert orjson_provider.dumps(data) == '{"pnl":null,"ratio":null}'
+    assert 'NaN' in default_provider.dumps(data)
+
+
+# Non-ASCII text is written as UTF-8, not \uXXXX escapes
+def test_non_ascii_is_not_escaped(providers):
+    orjson_provider, _ = providers
+    assert orjson_provider.dumps({'msg': '平仓'}) == '{"msg":"平仓"}'
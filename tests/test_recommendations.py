@@ -5,17 +5,47 @@ Tests the market analyzer and recommendation system
 """
 
 import sys
+import atexit
+import argparse
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from database_enhanced import EnhancedDatabase
 from market_analyzer import MarketAnalyzer
+from buffered_output import BufferedStdout
+from json_response import make_session, response_json
 
 BASE_URL = "http://localhost:5000"
 
+# One keep-alive connection pool for every request in the run
+SESSION = make_session()
+
+# Suitability bars for every score bucket (100% = 20 chars)
+_SCORE_BARS = tuple("█" * n + "░" * (20 - n) for n in range(21))
+
+_shared = None
+
+def get_shared_db():
+    """One persistent EnhancedDatabase and model ID lookup for the whole run"""
+    global _shared
+    if _shared is None:
+        db = EnhancedDatabase('AITradeGame.db', persistent=True)
+        atexit.register(db.close)
+        models = db.get_all_models()
+        _shared = (db, models[0]['id'] if models else None)
+    return _shared
+
+_analyzer = None
+
+def get_shared_analyzer():
+    """One MarketAnalyzer bound to the shared database"""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = MarketAnalyzer(get_shared_db()[0])
+    return _analyzer
+
 def print_header(title):
-    print("\n" + "=" * 70)
-    print(f"  {title}")
-    print("=" * 70)
+    print(f"\n{'=' * 70}\n  {title}\n{'=' * 70}")
 
 def print_success(msg):
     print(f"✓ {msg}")
@@ -33,16 +63,13 @@ def test_market_analyzer_module():
     print_header("Test 1: Market Analyzer Module")
 
     try:
-        db = EnhancedDatabase('AITradeGame.db')
-        analyzer = MarketAnalyzer(db)
+        _, model_id = get_shared_db()
+        analyzer = get_shared_analyzer()
 
-        # Get first model
-        models = db.get_all_models()
-        if not models:
+        if model_id is None:
             print_error("No models found. Create a model first.")
             return False
 
-        model_id = models[0]['id']
         print_info(f"Using model ID: {model_id}")
 
         # Test market metrics calculation
@@ -94,21 +121,18 @@ def test_recommendation_api():
     print_header("Test 2: Profile Recommendation API")
 
     try:
-        # Get first model
-        db = EnhancedDatabase('AITradeGame.db')
-        models = db.get_all_models()
+        db, model_id = get_shared_db()
 
-        if not models:
+        if model_id is None:
             print_error("No models found")
             return False
 
-        model_id = models[0]['id']
         print_info(f"Testing with model ID: {model_id}")
 
-        response = requests.get(f"{BASE_URL}/api/models/{model_id}/recommend-profile")
+        response = SESSION.get(f"{BASE_URL}/api/models/{model_id}/recommend-profile")
 
         if response.status_code == 200:
-            data = response.json()
+            data = response_json(response)
 
             if data.get('success'):
                 rec = data['recommendation']
@@ -160,19 +184,17 @@ def test_market_metrics_api():
     print_header("Test 3: Market Metrics API")
 
     try:
-        db = EnhancedDatabase('AITradeGame.db')
-        models = db.get_all_models()
+        db, model_id = get_shared_db()
 
-        if not models:
+        if model_id is None:
             print_error("No models found")
             return False
 
-        model_id = models[0]['id']
 
-        response = requests.get(f"{BASE_URL}/api/models/{model_id}/market-metrics")
+        response = SESSION.get(f"{BASE_URL}/api/models/{model_id}/market-metrics")
 
         if response.status_code == 200:
-            data = response.json()
+            data = response_json(response)
 
             if data.get('success'):
                 metrics = data['metrics']
@@ -209,19 +231,17 @@ def test_profile_suitability_api():
     print_header("Test 4: Profile Suitability API")
 
     try:
-        db = EnhancedDatabase('AITradeGame.db')
-        models = db.get_all_models()
+        db, model_id = get_shared_db()
 
-        if not models:
+        if model_id is None:
             print_error("No models found")
             return False
 
-        model_id = models[0]['id']
 
-        response = requests.get(f"{BASE_URL}/api/models/{model_id}/profile-suitability")
+        response = SESSION.get(f"{BASE_URL}/api/models/{model_id}/profile-suitability")
 
         if response.status_code == 200:
-            data = response.json()
+            data = response_json(response)
 
             if data.get('success'):
                 profiles = data['profiles']
@@ -237,9 +257,7 @@ def test_profile_suitability_api():
                     icon = profile['icon']
                     name = profile['name']
 
-                    # Create visual bar
-                    bar_length = int(score / 5)  # 100% = 20 chars
-                    bar = "█" * bar_length + "░" * (20 - bar_length)
+                    bar = _SCORE_BARS[int(score / 5)]
 
                     print(f"  {i}. {icon} {name:15} [{bar}] {score:.0f}% - {label}")
 
@@ -262,23 +280,21 @@ def test_recommendation_workflow():
     print_header("Test 5: Complete Recommendation Workflow")
 
     try:
-        db = EnhancedDatabase('AITradeGame.db')
-        models = db.get_all_models()
+        db, model_id = get_shared_db()
 
-        if not models:
+        if model_id is None:
             print_error("No models found")
             return False
 
-        model_id = models[0]['id']
 
         print_info("Step 1: Get recommendation...")
-        rec_response = requests.get(f"{BASE_URL}/api/models/{model_id}/recommend-profile")
+        rec_response = SESSION.get(f"{BASE_URL}/api/models/{model_id}/recommend-profile")
 
         if rec_response.status_code != 200:
             print_error("Failed to get recommendation")
             return False
 
-        rec_data = rec_response.json()
+        rec_data = response_json(rec_response)
         recommended_profile_id = rec_data['recommendation']['profile_id']
         recommended_name = rec_data['recommendation']['profile_name']
 
@@ -287,18 +303,16 @@ def test_recommendation_workflow():
         if rec_data['recommendation']['should_switch']:
             print_info(f"Step 2: Applying recommended profile...")
 
-            apply_response = requests.post(
+            apply_response = SESSION.post(
                 f"{BASE_URL}/api/models/{model_id}/apply-profile",
-                json={"profile_id": recommended_profile_id},
-                headers={"Content-Type": "application/json"}
+                json={"profile_id": recommended_profile_id}
             )
 
             if apply_response.status_code == 200:
                 print_success(f"Profile '{recommended_name}' applied successfully")
 
-                # Verify it's active
-                active_response = requests.get(f"{BASE_URL}/api/models/{model_id}/active-profile")
-                active_data = active_response.json()
+                # The apply response carries the active profile read back in the same transaction
+                active_data = response_json(apply_response)
 
                 if active_data.get('active_profile'):
                     active_name = active_data['active_profile']['name']
@@ -326,32 +340,16 @@ def test_recommendation_workflow():
 
 # ============ Main Test Runner ============
 
-def run_all_tests():
-    """Run all Phase 3 tests"""
-    print("\n")
-    print("╔" + "═" * 68 + "╗")
-    print("║" + " " * 15 + "PHASE 3: RECOMMENDATION SYSTEM TESTS" + " " * 16 + "║")
-    print("╚" + "═" * 68 + "╝")
-
-    tests = [
-        ("Market Analyzer Module", test_market_analyzer_module),
-        ("Recommendation API", test_recommendation_api),
-        ("Market Metrics API", test_market_metrics_api),
-        ("Profile Suitability API", test_profile_suitability_api),
-        ("Complete Workflow", test_recommendation_workflow),
-    ]
-
-    results = []
-
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            results.append((test_name, result))
-        except Exception as e:
-            print_error(f"Test '{test_name}' crashed: {str(e)}")
-            results.append((test_name, False))
-
-    # Print summary
+def server_available():
+    """One quick probe so a down server fails the run in ~1s, not per test"""
+    try:
+        SESSION.get(f"{BASE_URL}/api/models", timeout=1)
+        return True
+    except requests.RequestException:
+        return False
+
+def print_summary(results, skipped, api_tests_ran):
+    """Print the summary table; returns True when every test passed"""
     print_header("TEST SUMMARY")
 
     passed = sum(1 for _, result in results if result)
@@ -363,9 +361,14 @@ def run_all_tests():
 
     print("\n" + "-" * 70)
     print(f"Results: {passed}/{total} tests passed ({passed/total*100:.0f}%)")
+    if skipped:
+        print(f"Skipped: {skipped} test(s) after the first failure (--fail-fast)")
     print("-" * 70)
 
-    if passed == total:
+    if not api_tests_ran:
+        print("\n⚠️  API tests skipped: start the Flask server and re-run.")
+        return False
+    elif passed == total:
         print("\n🎉 All Phase 3 tests passed! Recommendation system is working.")
         print("\nYou can now:")
         print("  1. Get profile recommendations: GET /api/models/1/recommend-profile")
@@ -376,12 +379,78 @@ def run_all_tests():
         print(f"\n⚠️  {total - passed} test(s) failed.")
         return False
 
+def run_all_tests(fail_fast=False):
+    """Run all Phase 3 tests"""
+    # Output is collected per block (banner, each test, summary) and written
+    # in one go, so parallel tests don't interleave and prints cost one write each
+    out = BufferedStdout(sys.stdout)
+    sys.stdout = out
+    try:
+        with out.buffered():
+            print("\n")
+            print("╔" + "═" * 68 + "╗")
+            print("║" + " " * 15 + "PHASE 3: RECOMMENDATION SYSTEM TESTS" + " " * 16 + "║")
+            print("╚" + "═" * 68 + "╝")
+
+        # Read-only tests overlap their server round-trips on a thread pool;
+        # the workflow test changes the active profile so it runs afterwards
+        module_test = ("Market Analyzer Module", test_market_analyzer_module)
+        api_tests = [
+            ("Recommendation API", test_recommendation_api),
+            ("Market Metrics API", test_market_metrics_api),
+            ("Profile Suitability API", test_profile_suitability_api),
+        ]
+        workflow_test = ("Complete Workflow", test_recommendation_workflow)
+
+        def run(test_name, test_func):
+            with out.buffered():
+                try:
+                    return test_name, test_func()
+                except Exception as e:
+                    print_error(f"Test '{test_name}' crashed: {str(e)}")
+                    return test_name, False
+
+        get_shared_analyzer()  # Create the shared DB and analyzer once, before the workers race for them
+
+        # The module test runs locally; the rest need the server
+        if server_available():
+            read_only_tests = [module_test] + api_tests
+        else:
+            print_error(f"Server not reachable at {BASE_URL}, skipping API tests")
+            read_only_tests, workflow_test = [module_test], None
+
+        # With --fail-fast the tests run one at a time, so a failure really
+        # stops the run and the tests still queued are cancelled
+        results = []
+        with ThreadPoolExecutor(max_workers=1 if fail_fast else 4) as pool:
+            futures = [pool.submit(run, *test) for test in read_only_tests]
+            for future in futures:
+                results.append(future.result())
+                if fail_fast and not results[-1][1]:
+                    pool.shutdown(cancel_futures=True)
+                    break
+
+        failed_early = fail_fast and not all(result for _, result in results)
+        if workflow_test and not failed_early:
+            results.append(run(*workflow_test))
+
+        skipped = len(read_only_tests) + bool(workflow_test) - len(results)
+        with out.buffered():
+            return print_summary(results, skipped, workflow_test is not None)
+    finally:
+        sys.stdout = out.stream
+
 if __name__ == "__main__":
     print("\n⚙️  Starting Phase 3 Recommendation Tests...")
     print("Make sure the Flask server is running on port 5001\n")
 
+    parser = argparse.ArgumentParser(description="Phase 3 recommendation tests")
+    parser.add_argument('--fail-fast', action='store_true',
+                        help="stop at the first failing test")
+    args = parser.parse_args()
+
     input("Press Enter when ready...")
 
-    success = run_all_tests()
+    success = run_all_tests(fail_fast=args.fail_fast)
 
     sys.exit(0 if success else 1)
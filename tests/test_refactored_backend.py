@@ -1,180 +1,163 @@
 """
 Backend Testing Script - Refactored Architecture
 Tests the new environment + automation separation
+
+Requires the Flask server on BASE_URL (skipped otherwise). Read-only
+checks can run in parallel; tests marked `serial` change the model's
+state and must run afterwards, in file order:
+
+    pytest -n 4 -m "not serial" tests/test_refactored_backend.py
+    pytest -m serial tests/test_refactored_backend.py
+
+Running this file directly does both passes.
 """
+import sys
+import pytest
 import requests
-import json
+from json_response import make_session, response_json, cached_get
 
 BASE_URL = "http://localhost:5000"
-MODEL_ID = 1
 
-def test(name, func):
-    """Test helper"""
+
+@pytest.fixture(scope='module')
+def session():
+    """One keep-alive connection pool for every request in the module"""
+    s = make_session()
+    yield s
+    s.close()
+
+
+@pytest.fixture(scope='module')
+def model_url(session):
+    """URL of the first existing model, looked up once before any test runs"""
     try:
-        print(f"\n{name}...", end=" ")
-        result = func()
-        print("✓")
-        return result
-    except Exception as e:
-        print(f"✗ {e}")
-        return None
-
-print("=" * 60)
-print("REFACTORED BACKEND TEST")
-print("Testing: Environment + Automation Separation")
-print("=" * 60)
+        models = cached_get(session, f"{BASE_URL}/api/models", timeout=2)
+    except requests.ConnectionError:
+        pytest.skip(f"Flask server not running on {BASE_URL}")
+    assert models, "No models found. Create a model first."
+    return f"{BASE_URL}/api/models/{models[0]['id']}"
+
+
+# ============ Read-only Tests ============
 
 # Test 1: Get current configuration
-def test_get_config():
-    r = requests.get(f"{BASE_URL}/api/models/{MODEL_ID}/config")
+def test_get_config(session, model_url):
+    r = session.get(f"{model_url}/config")
     assert r.status_code == 200
-    config = r.json()
+    config = response_json(r)
     assert 'environment' in config
     assert 'automation' in config
     assert 'exchange_environment' in config
-    return config
 
-config = test("1. Get model configuration", test_get_config)
-if config:
+    # Unchanged config revalidates without a body
+    r = session.get(f"{model_url}/config", headers={'If-None-Match': r.headers['ETag']})
+    assert r.status_code == 304
     print(f"   Environment: {config['environment']}")
     print(f"   Automation: {config['automation']}")
     print(f"   Exchange: {config['exchange_environment']}")
 
 # Test 2: Get environment separately
-def test_get_environment():
-    r = requests.get(f"{BASE_URL}/api/models/{MODEL_ID}/environment")
+def test_get_environment(session, model_url):
+    r = session.get(f"{model_url}/environment")
     assert r.status_code == 200
-    data = r.json()
+    data = response_json(r)
     assert 'environment' in data
-    return data['environment']
-
-env = test("2. Get trading environment", test_get_environment)
-if env:
-    print(f"   Current: {env}")
+    print(f"   Current: {data['environment']}")
 
 # Test 3: Get automation separately
-def test_get_automation():
-    r = requests.get(f"{BASE_URL}/api/models/{MODEL_ID}/automation")
+def test_get_automation(session, model_url):
+    r = session.get(f"{model_url}/automation")
     assert r.status_code == 200
-    data = r.json()
+    data = response_json(r)
     assert 'automation' in data
-    return data['automation']
+    print(f"   Current: {data['automation']}")
 
-auto = test("3. Get automation level", test_get_automation)
-if auto:
-    print(f"   Current: {auto}")
+# Test 7: Test backward compatibility with legacy mode endpoint
+def test_legacy_mode(session, model_url):
+    r = session.get(f"{model_url}/mode")
+    assert r.status_code == 200
+    mode = response_json(r)['mode']
 
-# Test 4: Change automation level (stay in simulation)
-def test_change_automation():
-    r = requests.post(f"{BASE_URL}/api/models/{MODEL_ID}/automation",
-                      json={'automation': 'semi_automated'})
+    # The combined state read reports the same legacy mode
+    r = session.get(f"{model_url}/state")
     assert r.status_code == 200
-    assert r.json()['success'] == True
-    return r.json()
+    data = response_json(r)
+    assert data['mode'] == mode
+    assert 'active_profile' in data
+    print(f"   Legacy mode: {mode}")
 
-test("4. Change automation to semi_automated", test_change_automation)
+# Test 11: Test incidents logged
+def test_incidents(session, model_url):
+    r = session.get(f"{model_url}/incidents/summary",
+                    params={'types': 'ENVIRONMENT_CHANGE,AUTOMATION_CHANGE'})
+    assert r.status_code == 200
+    counts = response_json(r)
+    print(f"   Found {sum(counts.values())} environment/automation incidents")
+    print(f"   - Environment changes: {counts['ENVIRONMENT_CHANGE']}")
+    print(f"   - Automation changes: {counts['AUTOMATION_CHANGE']}")
 
-# Test 5: Verify automation changed
-def test_verify_automation():
-    r = requests.get(f"{BASE_URL}/api/models/{MODEL_ID}/automation")
-    data = r.json()
-    assert data['automation'] == 'semi_automated'
-    return data['automation']
 
-auto = test("5. Verify automation changed", test_verify_automation)
-if auto:
-    print(f"   Now: {auto}")
+# ============ State-changing Tests (run in order) ============
 
-# Test 6: Change back to manual
-def test_reset_automation():
-    r = requests.post(f"{BASE_URL}/api/models/{MODEL_ID}/automation",
-                      json={'automation': 'manual'})
+# Test 4: Change automation level (stay in simulation)
+@pytest.mark.serial
+def test_change_automation(session, model_url):
+    r = session.post(f"{model_url}/automation", json={'automation': 'semi_automated'})
     assert r.status_code == 200
-    return r.json()
+    assert response_json(r)['success'] == True
 
-test("6. Reset automation to manual", test_reset_automation)
+# Test 5: Verify automation changed
+@pytest.mark.serial
+def test_verify_automation(session, model_url):
+    data = response_json(session.get(f"{model_url}/automation"))
+    assert data['automation'] == 'semi_automated'
+    print(f"   Now: {data['automation']}")
 
-# Test 7: Test backward compatibility with legacy mode endpoint
-def test_legacy_mode():
-    r = requests.get(f"{BASE_URL}/api/models/{MODEL_ID}/mode")
+# Test 6: Change back to manual
+@pytest.mark.serial
+def test_reset_automation(session, model_url):
+    r = session.post(f"{model_url}/automation", json={'automation': 'manual'})
     assert r.status_code == 200
-    data = r.json()
-    assert 'mode' in data
-    return data['mode']
-
-mode = test("7. Test legacy mode endpoint (backward compat)", test_legacy_mode)
-if mode:
-    print(f"   Legacy mode: {mode}")
 
 # Test 8: Set legacy mode and verify it maps correctly
-def test_legacy_mode_set():
+@pytest.mark.serial
+def test_legacy_mode_set(session, model_url):
     # Set to semi_automated via legacy endpoint
-    r = requests.post(f"{BASE_URL}/api/models/{MODEL_ID}/mode",
-                      json={'mode': 'semi_automated'})
+    r = session.post(f"{model_url}/mode", json={'mode': 'semi_automated'})
     assert r.status_code == 200
+    assert response_json(r)['mode'] == 'semi_automated'
+    assert response_json(session.get(f"{model_url}/mode"))['mode'] == 'semi_automated'
 
     # Verify it maps to environment=live, automation=semi_automated
-    config = requests.get(f"{BASE_URL}/api/models/{MODEL_ID}/config").json()
+    config = response_json(session.get(f"{model_url}/state"))
     assert config['environment'] == 'live'
     assert config['automation'] == 'semi_automated'
-    return config
-
-config = test("8. Test legacy mode mapping", test_legacy_mode_set)
-if config:
+    assert config['mode'] == 'semi_automated'
     print(f"   Mode 'semi_automated' mapped to:")
     print(f"     - environment: {config['environment']}")
     print(f"     - automation: {config['automation']}")
 
 # Test 9: Reset to simulation
-def test_reset_simulation():
-    r = requests.post(f"{BASE_URL}/api/models/{MODEL_ID}/environment",
-                      json={'environment': 'simulation'})
-    assert r.status_code == 200
-
-    r = requests.post(f"{BASE_URL}/api/models/{MODEL_ID}/automation",
-                      json={'automation': 'manual'})
+@pytest.mark.serial
+def test_reset_simulation(session, model_url):
+    r = session.post(f"{model_url}/config",
+                     json={'environment': 'simulation', 'automation': 'manual'})
     assert r.status_code == 200
-    return True
-
-test("9. Reset to simulation + manual", test_reset_simulation)
 
 # Test 10: Verify final state
-def test_final_state():
-    config = requests.get(f"{BASE_URL}/api/models/{MODEL_ID}/config").json()
+@pytest.mark.serial
+def test_final_state(session, model_url):
+    config = response_json(session.get(f"{model_url}/config"))
     assert config['environment'] == 'simulation'
     assert config['automation'] == 'manual'
-    return config
-
-config = test("10. Verify final state", test_final_state)
-if config:
     print(f"   Final configuration:")
     print(f"     - environment: {config['environment']}")
     print(f"     - automation: {config['automation']}")
 
-# Test 11: Test incidents logged
-def test_incidents():
-    r = requests.get(f"{BASE_URL}/api/models/{MODEL_ID}/incidents?limit=10")
-    assert r.status_code == 200
-    incidents = r.json()
-    return incidents
-
-incidents = test("11. Check incidents were logged", test_incidents)
-if incidents:
-    print(f"   Found {len(incidents)} recent incidents")
-    env_changes = [i for i in incidents if i['incident_type'] == 'ENVIRONMENT_CHANGE']
-    auto_changes = [i for i in incidents if i['incident_type'] == 'AUTOMATION_CHANGE']
-    print(f"   - Environment changes: {len(env_changes)}")
-    print(f"   - Automation changes: {len(auto_changes)}")
-
-print("\n" + "=" * 60)
-print("ALL BACKEND TESTS PASSED! ✓")
-print("=" * 60)
-print("\n✅ New architecture is working correctly!")
-print("\nKey Features Verified:")
-print("  ✓ Separate environment and automation controls")
-print("  ✓ Environment: simulation ⟷ live")
-print("  ✓ Automation: manual, semi_automated, fully_automated")
-print("  ✓ Backward compatibility with legacy mode API")
-print("  ✓ Proper incident logging")
-print("  ✓ State persistence")
-print("\n" + "=" * 60)
+
+if __name__ == '__main__':
+    # Read-only pass first, then the state-changing tests in order
+    exit_code = pytest.main([__file__, '-v', '-m', 'not serial'])
+    if exit_code == 0:
+        exit_code = pytest.main([__file__, '-v', '-m', 'serial'])
+    sys.exit(exit_code)
@@ -5,13 +5,36 @@ Tests all functionality including database, API, and profile application
 """
 
 import sys
+import atexit
+import logging
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from database_enhanced import EnhancedDatabase
 from datetime import datetime
+from buffered_output import BufferedStdout
+from json_response import make_session, wait_ready
 
 BASE_URL = "http://localhost:5000"
 
+logger = logging.getLogger(__name__)
+
+# One keep-alive connection pool for every request in the run
+SESSION = make_session()
+
+_db = None
+
+# Model the profile tests run against, found (or created) by test 4
+MODEL_ID = None
+
+def get_db():
+    """One persistent EnhancedDatabase for the whole run"""
+    global _db
+    if _db is None:
+        _db = EnhancedDatabase('AITradeGame.db', persistent=True)
+        atexit.register(_db.close)
+    return _db
+
 def print_section(title):
     """Print a section header"""
     print("\n" + "=" * 60)
@@ -37,7 +60,7 @@ def test_database_initialization():
     print_section("Test 1: Database Initialization")
 
     try:
-        db = EnhancedDatabase('AITradeGame.db')
+        db = get_db()
 
         # Test profile table exists
         conn = db.get_connection()
@@ -56,8 +79,6 @@ def test_database_initialization():
             print_error("profile_sessions table NOT found")
             return False
 
-        conn.close()
-
         # Test system profiles initialized
         profiles = db.get_all_risk_profiles()
         system_profiles = [p for p in profiles if p['is_system_preset']]
@@ -65,7 +86,7 @@ def test_database_initialization():
         print_info(f"Found {len(profiles)} total profiles, {len(system_profiles)} system presets")
 
         expected_profiles = ['Ultra-Safe', 'Conservative', 'Balanced', 'Aggressive', 'Scalper']
-        found_names = [p['name'] for p in system_profiles]
+        found_names = {p['name'] for p in system_profiles}
 
         for name in expected_profiles:
             if name in found_names:
@@ -98,7 +119,7 @@ def test_api_get_all_profiles():
     print_section("Test 2: API - Get All Profiles")
 
     try:
-        response = requests.get(f"{BASE_URL}/api/risk-profiles")
+        response = SESSION.get(f"{BASE_URL}/api/risk-profiles")
 
         if response.status_code == 200:
             print_success(f"API returned status 200")
@@ -127,7 +148,7 @@ def test_api_get_specific_profile():
 
     try:
         # Get Balanced profile (ID 3)
-        response = requests.get(f"{BASE_URL}/api/risk-profiles/3")
+        response = SESSION.get(f"{BASE_URL}/api/risk-profiles/3")
 
         if response.status_code == 200:
             print_success("Retrieved specific profile")
@@ -150,11 +171,12 @@ def test_api_get_specific_profile():
 
 def test_api_apply_profile():
     """Test 4: POST /api/models/<id>/apply-profile"""
+    global MODEL_ID
     print_section("Test 4: API - Apply Profile to Model")
 
     try:
         # First, check if model 1 exists
-        db = EnhancedDatabase('AITradeGame.db')
+        db = get_db()
         models = db.get_all_models()
 
         if not models:
@@ -169,33 +191,36 @@ def test_api_apply_profile():
         else:
             model_id = models[0]['id']
             print_info(f"Using existing model ID: {model_id}")
+        MODEL_ID = model_id
 
         # Apply Aggressive profile (ID 4)
         print_info("Applying 'Aggressive' profile (ID 4)...")
 
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/api/models/{model_id}/apply-profile",
-            json={"profile_id": 4},
-            headers={"Content-Type": "application/json"}
+            json={"profile_id": 4}
         )
 
         if response.status_code == 200:
             result = response.json()
             print_success(f"Profile applied: {result['message']}")
 
-            # Verify settings changed
-            settings = db.get_model_settings(model_id)
+            # Verify settings changed, reading back only the checked columns
+            cursor = db.get_connection().cursor()
+            cursor.execute("""
+                SELECT max_position_size_pct, max_daily_loss_pct, max_daily_trades, active_profile_id
+                FROM model_settings WHERE model_id = ?
+            """, (model_id,))
+            position_size, daily_loss, daily_trades, active_profile_id = cursor.fetchone()
 
             print("\n   Updated Settings:")
-            print(f"   - Max Position Size: {settings['max_position_size_pct']}% (should be 15%)")
-            print(f"   - Max Daily Loss: {settings['max_daily_loss_pct']}% (should be 5%)")
-            print(f"   - Max Daily Trades: {settings['max_daily_trades']} (should be 40)")
-            print(f"   - Active Profile ID: {settings.get('active_profile_id', 'None')}")
+            print(f"   - Max Position Size: {position_size}% (should be 15%)")
+            print(f"   - Max Daily Loss: {daily_loss}% (should be 5%)")
+            print(f"   - Max Daily Trades: {daily_trades} (should be 40)")
+            print(f"   - Active Profile ID: {active_profile_id}")
 
             # Verify correct values
-            if (settings['max_position_size_pct'] == 15.0 and
-                settings['max_daily_loss_pct'] == 5.0 and
-                settings['max_daily_trades'] == 40):
+            if (position_size, daily_loss, daily_trades) == (15.0, 5.0, 40):
                 print_success("Settings match Aggressive profile!")
                 return True
             else:
@@ -207,8 +232,7 @@ def test_api_apply_profile():
 
     except Exception as e:
         print_error(f"Test failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("apply-profile failed")
         return False
 
 def test_api_get_active_profile():
@@ -216,16 +240,17 @@ def test_api_get_active_profile():
     print_section("Test 5: API - Get Active Profile")
 
     try:
-        db = EnhancedDatabase('AITradeGame.db')
-        models = db.get_all_models()
+        model_id = MODEL_ID
+        if model_id is None:
+            models = get_db().get_all_models()
 
-        if not models:
-            print_error("No models found")
-            return False
+            if not models:
+                print_error("No models found")
+                return False
 
-        model_id = models[0]['id']
+            model_id = models[0]['id']
 
-        response = requests.get(f"{BASE_URL}/api/models/{model_id}/active-profile")
+        response = SESSION.get(f"{BASE_URL}/api/models/{model_id}/active-profile")
 
         if response.status_code == 200:
             result = response.json()
@@ -271,10 +296,9 @@ def test_custom_profile_creation():
 
         print_info("Creating custom profile...")
 
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/api/risk-profiles",
-            json=custom_profile,
-            headers={"Content-Type": "application/json"}
+            json=custom_profile
         )
 
         if response.status_code == 200:
@@ -282,7 +306,7 @@ def test_custom_profile_creation():
             print_success(f"Custom profile created with ID: {result['profile_id']}")
 
             # Verify it's in the list
-            all_profiles = requests.get(f"{BASE_URL}/api/risk-profiles").json()
+            all_profiles = SESSION.get(f"{BASE_URL}/api/risk-profiles").json()
             custom_profiles = [p for p in all_profiles if not p['is_system_preset']]
 
             print_info(f"Total custom profiles: {len(custom_profiles)}")
@@ -305,10 +329,9 @@ def test_profile_comparison():
         # Compare Ultra-Safe (1) vs Aggressive (4)
         print_info("Comparing Ultra-Safe vs Aggressive...")
 
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/api/risk-profiles/compare",
-            json={"profile_ids": [1, 4]},
-            headers={"Content-Type": "application/json"}
+            json={"profile_ids": [1, 4]}
         )
 
         if response.status_code == 200:
@@ -344,7 +367,7 @@ def test_profile_protection():
     try:
         print_info("Attempting to delete system preset (should fail)...")
 
-        response = requests.delete(f"{BASE_URL}/api/risk-profiles/1")  # Ultra-Safe
+        response = SESSION.delete(f"{BASE_URL}/api/risk-profiles/1")  # Ultra-Safe
 
         if response.status_code == 403:
             print_success("System profile correctly protected from deletion")
@@ -369,6 +392,8 @@ def run_all_tests():
     print("║" + " " * 10 + "RISK PROFILE SYSTEM TEST SUITE" + " " * 17 + "║")
     print("╚" + "═" * 58 + "╝")
 
+    # Tests that write (or read what another test wrote) run in order first;
+    # the read-only ones then overlap their round-trips on the shared Session
     tests = [
         ("Database Initialization", test_database_initialization),
         ("API: Get All Profiles", test_api_get_all_profiles),
@@ -379,44 +404,62 @@ def run_all_tests():
         ("Profile Comparison", test_profile_comparison),
         ("System Profile Protection", test_profile_protection),
     ]
+    sequential = {test_database_initialization, test_api_apply_profile, test_custom_profile_creation}
 
-    results = []
+    # Each test's output is written in one block so parallel tests don't interleave
+    out = BufferedStdout(sys.stdout)
 
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            results.append((test_name, result))
-        except Exception as e:
-            print_error(f"Test '{test_name}' crashed: {str(e)}")
-            results.append((test_name, False))
+    def run(test_name, test_func):
+        with out.buffered():
+            try:
+                return test_name, test_func()
+            except Exception as e:
+                print_error(f"Test '{test_name}' crashed: {str(e)}")
+                return test_name, False
 
-    # Print summary
-    print_section("TEST SUMMARY")
+    sys.stdout = out
+    try:
+        outcome = {name: run(name, func)[1] for name, func in tests if func in sequential}
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            outcome.update(pool.map(lambda test: run(*test),
+                                    [test for test in tests if test[1] not in sequential]))
 
-    passed = sum(1 for _, result in results if result)
-    total = len(results)
+        with out.buffered():
+            # Summary in the original test order
+            results = [(name, outcome[name]) for name, _ in tests]
 
-    for test_name, result in results:
-        status = "✓ PASS" if result else "✗ FAIL"
-        print(f"{status:8} | {test_name}")
+            # Print summary
+            print_section("TEST SUMMARY")
 
-    print("\n" + "-" * 60)
-    print(f"Results: {passed}/{total} tests passed ({passed/total*100:.0f}%)")
-    print("-" * 60)
+            passed = sum(result for _, result in results)
+            total = len(results)
 
-    if passed == total:
-        print("\n🎉 All tests passed! Risk Profile system is working correctly.")
-        return True
-    else:
-        print(f"\n⚠️  {total - passed} test(s) failed. Please review errors above.")
-        return False
+            for test_name, result in results:
+                status = "✓ PASS" if result else "✗ FAIL"
+                print(f"{status:8} | {test_name}")
+
+            print("\n" + "-" * 60)
+            print(f"Results: {passed}/{total} tests passed ({passed/total*100:.0f}%)")
+            print("-" * 60)
+
+            if passed == total:
+                print("\n🎉 All tests passed! Risk Profile system is working correctly.")
+                return True
+            else:
+                print(f"\n⚠️  {total - passed} test(s) failed. Please review errors above.")
+                return False
+    finally:
+        sys.stdout = out.stream
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     print("\n⚙️  Starting Risk Profile System Tests...")
-    print("Make sure the Flask server is running on port 5001")
+    print(f"Waiting for the Flask server on {BASE_URL}")
     print("You can start it with: python3 app.py\n")
 
-    input("Press Enter when ready to begin tests...")
+    if not wait_ready(SESSION, f"{BASE_URL}/api/risk-profiles"):
+        print_error(f"Server on {BASE_URL} did not become ready")
+        sys.exit(1)
 
     success = run_all_tests()
 
@@ -1,40 +1,34 @@
 """Quick test to verify all routes are registered correctly"""
 import sys
+from collections import defaultdict
+from operator import itemgetter
 
 try:
     # Import the Flask app
     from app import app
     
-    # Get all registered routes
-    routes = []
+    # Group routes by blueprint in one pass over the url map
+    blueprints = defaultdict(list)
     for rule in app.url_map.iter_rules():
-        routes.append({
-            'endpoint': rule.endpoint,
-            'methods': ','.join(sorted(rule.methods - {'HEAD', 'OPTIONS'})),
-            'path': str(rule)
-        })
+        endpoint = rule.endpoint
+        bp, dot, _ = endpoint.partition('.')
+        methods = ','.join(sorted(rule.methods - {'HEAD', 'OPTIONS'}))
+        blueprints[bp if dot else 'main'].append((str(rule), methods, endpoint))
     
-    # Sort by path
-    routes.sort(key=lambda x: x['path'])
+    # Sort each blueprint by path
+    for bp_routes in blueprints.values():
+        bp_routes.sort(key=itemgetter(0))
     
     print("=" * 80)
     print("ROUTE REGISTRATION TEST - SUCCESS")
     print("=" * 80)
-    print(f"\nTotal Routes Registered: {len(routes)}\n")
-    
-    # Group by blueprint
-    blueprints = {}
-    for route in routes:
-        bp = route['endpoint'].split('.')[0] if '.' in route['endpoint'] else 'main'
-        if bp not in blueprints:
-            blueprints[bp] = []
-        blueprints[bp].append(route)
+    print(f"\nTotal Routes Registered: {sum(map(len, blueprints.values()))}\n")
     
     for bp_name, bp_routes in sorted(blueprints.items()):
         print(f"\n{bp_name.upper()} ({len(bp_routes)} routes)")
         print("-" * 40)
-        for route in bp_routes[:5]:  # Show first 5 of each blueprint
-            print(f"  {route['methods']:20} {route['path']}")
+        for path, methods, _ in bp_routes[:5]:  # Show first 5 of each blueprint
+            print(f"  {methods:20} {path}")
         if len(bp_routes) > 5:
             print(f"  ... and {len(bp_routes) - 5} more routes")
     
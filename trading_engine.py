@@ -1,17 +1,125 @@
 from datetime import datetime
 from typing import Dict
 import json
+import logging
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """Single daemon thread that commits queued bookkeeping writes in batches
+
+    Each queued item is (callable, args, kwargs), usually a db method
+    queued by name; a batch runs inside one db.transaction() so it costs
+    one commit however many rows it holds. One writer is shared by every
+    engine and executor on the same database object. The writer only holds
+    the db weakly; once the db is gone, or at interpreter exit, the queue
+    is flushed and the thread stops.
+    """
+
+    BATCH_WINDOW = 0.05  # seconds to wait for more items before committing
+    _writers = weakref.WeakKeyDictionary()
+    _writers_lock = threading.Lock()
+
+    @classmethod
+    def for_db(cls, db) -> 'BackgroundWriter':
+        with cls._writers_lock:
+            writer = cls._writers.get(db)
+            if writer is None:
+                writer = cls._writers[db] = cls(db)
+            return writer
+
+    def __init__(self, db):
+        self._db = weakref.ref(db)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+        weakref.finalize(db, self.close)
+
+    @property
+    def db(self):
+        return self._db()
+
+    def enqueue(self, method: str, *args, **kwargs):
+        self._queue.put((getattr(self.db, method), args, kwargs))
+
+    def enqueue_call(self, func, *args, **kwargs):
+        """Queue any callable that writes through this writer's db"""
+        self._queue.put((func, args, kwargs))
+
+    def close(self):
+        """Flush everything queued so far and stop the thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            if threading.current_thread() is not self._thread:
+                self._thread.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.BATCH_WINDOW
+            while batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is None
+            items = batch[:-1] if stop else batch
+            if items:
+                self._write(items)
+            # Don't keep the last batch (and the db it references) alive while idle
+            del batch, items
+            if stop:
+                return
+
+    def _write(self, items):
+        try:
+            with self.db.transaction():
+                for func, args, kwargs in items:
+                    func(*args, **kwargs)
+        except Exception:
+            logger.exception("Background write of %d rows failed", len(items))
+
 
 class TradingEngine:
+    # One engine lives per model for the life of the app; fixed slots keep
+    # the instances small and attribute access off the instance dict
+    __slots__ = ('model_id', 'db', 'market_fetcher', 'ai_trader', 'coins',
+                 '_coin_set', 'trade_fee_rate', '_model', '_model_loaded_at', '_writer')
+
+    # Seconds a cached models row stays fresh (initial_capital never changes)
+    MODEL_CACHE_TTL = 300
+
     def __init__(self, model_id: int, db, market_fetcher, ai_trader, trade_fee_rate: float = 0.001):
         self.model_id = model_id
         self.db = db
         self.market_fetcher = market_fetcher
         self.ai_trader = ai_trader
-        self.coins = ['BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE']
+        self.coins = ('BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE')
+        self._coin_set = frozenset(self.coins)
         self.trade_fee_rate = trade_fee_rate  # 从配置中传入费率
+        self._model = None
+        self._model_loaded_at = 0.0
+        self._writer = BackgroundWriter.for_db(db)
     
-    def execute_trading_cycle(self) -> Dict:
+    def execute_trading_cycle(self, now_str: str = None) -> Dict:
+        """Run one decide-and-execute cycle
+
+        now_str lets a caller running several models in the same tick pass
+        one shared timestamp instead of formatting it per model.
+        """
+        if now_str is None:
+            now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         try:
             market_state = self._get_market_state()
             
@@ -19,29 +127,38 @@ class TradingEngine:
             
             portfolio = self.db.get_portfolio(self.model_id, current_prices)
             
-            account_info = self._build_account_info(portfolio)
+            account_info = self._build_account_info(portfolio, now_str)
             
             decisions = self.ai_trader.make_decision(
                 market_state, portfolio, account_info
             )
 
-            # Debug: Print AI decisions
-            print(f"[DEBUG] AI decisions for model {self.model_id}: {json.dumps(decisions, indent=2)}")
+            # Serialized once for both the debug log and the conversation row
+            decisions_json = json.dumps(decisions, ensure_ascii=False)
+            logger.debug("AI decisions for model %s: %s", self.model_id, decisions_json)
 
-            self.db.add_conversation(
+            self._writer.enqueue(
+                'add_conversation',
                 self.model_id,
                 user_prompt=self._format_prompt(market_state, portfolio, account_info),
-                ai_response=json.dumps(decisions, ensure_ascii=False),
+                ai_response=decisions_json,
                 cot_trace=''
             )
 
             execution_results = self._execute_decisions(decisions, market_state, portfolio)
 
-            # Debug: Print execution results
-            print(f"[DEBUG] Execution results for model {self.model_id}: {json.dumps(execution_results, indent=2, default=str)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Execution results for model %s: %s", self.model_id,
+                             json.dumps(execution_results, default=str))
             
-            updated_portfolio = self.db.get_portfolio(self.model_id, current_prices)
-            self.db.record_account_value(
+            # Positions only move when a trade went through; otherwise the
+            # portfolio read before the decision is still current
+            if any('error' not in r and r.get('signal') != 'hold' for r in execution_results):
+                updated_portfolio = self.db.get_portfolio(self.model_id, current_prices)
+            else:
+                updated_portfolio = portfolio
+            self._writer.enqueue(
+                'record_account_value',
                 self.model_id,
                 updated_portfolio['total_value'],
                 updated_portfolio['cash'],
@@ -67,23 +184,41 @@ class TradingEngine:
     def _get_market_state(self) -> Dict:
         market_state = {}
         prices = self.market_fetcher.get_current_prices(self.coins)
+        coins = [coin for coin in self.coins if coin in prices]
+        if not coins:
+            return market_state
         
-        for coin in self.coins:
-            if coin in prices:
-                market_state[coin] = prices[coin].copy()
-                indicators = self.market_fetcher.calculate_technical_indicators(coin)
-                market_state[coin]['indicators'] = indicators
+        # Each coin's indicators need their own history request; fetch them together
+        with ThreadPoolExecutor(max_workers=len(coins)) as pool:
+            futures = {coin: pool.submit(self.market_fetcher.calculate_technical_indicators, coin)
+                       for coin in coins}
+        
+        for coin in coins:
+            market_state[coin] = prices[coin].copy()
+            try:
+                market_state[coin]['indicators'] = futures[coin].result()
+            except Exception as e:
+                logger.warning("Indicators unavailable for %s: %s", coin, e)
+                market_state[coin]['indicators'] = {}
         
         return market_state
     
-    def _build_account_info(self, portfolio: Dict) -> Dict:
-        model = self.db.get_model(self.model_id)
+    def _get_model(self) -> Dict:
+        """Model row, re-read at most once per MODEL_CACHE_TTL"""
+        now = time.monotonic()
+        if self._model is None or now - self._model_loaded_at > self.MODEL_CACHE_TTL:
+            self._model = self.db.get_model(self.model_id)
+            self._model_loaded_at = now
+        return self._model
+
+    def _build_account_info(self, portfolio: Dict, now_str: str) -> Dict:
+        model = self._get_model()
         initial_capital = model['initial_capital']
         total_value = portfolio['total_value']
         total_return = ((total_value - initial_capital) / initial_capital) * 100
         
         return {
-            'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'current_time': now_str,
             'total_return': total_return,
             'initial_capital': initial_capital
         }
@@ -95,22 +230,26 @@ class TradingEngine:
     def _execute_decisions(self, decisions: Dict, market_state: Dict, 
                           portfolio: Dict) -> list:
         results = []
+        positions_by_coin = {pos['coin']: pos for pos in reversed(portfolio['positions'])}
+        
+        # Signal -> handler, bound once per cycle
+        handlers = {
+            'buy_to_enter': partial(self._execute_enter, side='long'),
+            'sell_to_enter': partial(self._execute_enter, side='short'),
+            'close_position': partial(self._execute_close, positions_by_coin=positions_by_coin),
+            'hold': self._execute_hold,
+        }
         
         for coin, decision in decisions.items():
-            if coin not in self.coins:
+            if coin not in self._coin_set:
                 continue
             
             signal = decision.get('signal', '').lower()
             
             try:
-                if signal == 'buy_to_enter':
-                    result = self._execute_buy(coin, decision, market_state, portfolio)
-                elif signal == 'sell_to_enter':
-                    result = self._execute_sell(coin, decision, market_state, portfolio)
-                elif signal == 'close_position':
-                    result = self._execute_close(coin, decision, market_state, portfolio)
-                elif signal == 'hold':
-                    result = {'coin': coin, 'signal': 'hold', 'message': 'Hold position'}
+                handler = handlers.get(signal)
+                if handler:
+                    result = handler(coin, decision, market_state, portfolio)
                 else:
                     result = {'coin': coin, 'error': f'Unknown signal: {signal}'}
                 
@@ -121,8 +260,35 @@ class TradingEngine:
         
         return results
     
-    def _execute_buy(self, coin: str, decision: Dict, market_state: Dict, 
-                    portfolio: Dict) -> Dict:
+    def _execute_hold(self, coin: str, decision: Dict, market_state: Dict, 
+                     portfolio: Dict) -> Dict:
+        return {'coin': coin, 'signal': 'hold'}
+    
+    # side -> signal recorded on the trade
+    _ENTRY_SIGNALS = {
+        'long': 'buy_to_enter',
+        'short': 'sell_to_enter',
+    }
+
+    @staticmethod
+    def describe_result(result: Dict) -> str:
+        """Human-readable summary of an execution result, built only when logged"""
+        signal = result.get('signal')
+        coin = result.get('coin')
+        if signal == 'hold':
+            return 'Hold position'
+        if signal == 'close_position':
+            return (f"Close {coin}, Gross P&L: ${result['gross_pnl']:.2f}, "
+                    f"Fee: ${result['fee']:.2f}, Net P&L: ${result['pnl']:.2f}")
+        if signal in ('buy_to_enter', 'sell_to_enter'):
+            word = 'Long' if result['side'] == 'long' else 'Short'
+            return (f"{word} {result['quantity']:.4f} {coin} @ ${result['price']:.2f} "
+                    f"(Fee: ${result['fee']:.2f})")
+        return ''
+
+    def _execute_enter(self, coin: str, decision: Dict, market_state: Dict, 
+                      portfolio: Dict, side: str) -> Dict:
+        signal = self._ENTRY_SIGNALS[side]
         quantity = float(decision.get('quantity', 0))
         leverage = int(decision.get('leverage', 1))
         price = market_state[coin]['price']
@@ -133,47 +299,7 @@ class TradingEngine:
         # 计算交易额和交易费（按交易额的比例）
         trade_amount = quantity * price  # 交易额
         trade_fee = trade_amount * self.trade_fee_rate  # 交易费（0.1%）
-        required_margin = (quantity * price) / leverage  # 保证金
-        
-        # 总需资金 = 保证金 + 交易费
-        total_required = required_margin + trade_fee
-        if total_required > portfolio['cash']:
-            return {'coin': coin, 'error': 'Insufficient cash (including fees)'}
-        
-        # 更新持仓
-        self.db.update_position(
-            self.model_id, coin, quantity, price, leverage, 'long'
-        )
-        
-        # 记录交易（包含交易费）
-        self.db.add_trade(
-            self.model_id, coin, 'buy_to_enter', quantity, 
-            price, leverage, 'long', pnl=0, fee=trade_fee  # 新增fee参数
-        )
-        
-        return {
-            'coin': coin,
-            'signal': 'buy_to_enter',
-            'quantity': quantity,
-            'price': price,
-            'leverage': leverage,
-            'fee': trade_fee,  # 返回费用信息
-            'message': f'Long {quantity:.4f} {coin} @ ${price:.2f} (Fee: ${trade_fee:.2f})'
-        }
-    
-    def _execute_sell(self, coin: str, decision: Dict, market_state: Dict, 
-                 portfolio: Dict) -> Dict:
-        quantity = float(decision.get('quantity', 0))
-        leverage = int(decision.get('leverage', 1))
-        price = market_state[coin]['price']
-        
-        if quantity <= 0:
-            return {'coin': coin, 'error': 'Invalid quantity'}
-        
-        # 计算交易额和交易费
-        trade_amount = quantity * price
-        trade_fee = trade_amount * self.trade_fee_rate
-        required_margin = (quantity * price) / leverage
+        required_margin = trade_amount / leverage  # 保证金
         
         # 总需资金 = 保证金 + 交易费
         total_required = required_margin + trade_fee
@@ -182,32 +308,30 @@ class TradingEngine:
         
         # 更新持仓
         self.db.update_position(
-            self.model_id, coin, quantity, price, leverage, 'short'
+            self.model_id, coin, quantity, price, leverage, side
         )
         
         # 记录交易（包含交易费）
         self.db.add_trade(
-            self.model_id, coin, 'sell_to_enter', quantity, 
-            price, leverage, 'short', pnl=0, fee=trade_fee  # 新增fee参数
+            self.model_id, coin, signal, quantity, 
+            price, leverage, side, pnl=0, fee=trade_fee
         )
         
         return {
             'coin': coin,
-            'signal': 'sell_to_enter',
+            'signal': signal,
             'quantity': quantity,
             'price': price,
             'leverage': leverage,
-            'fee': trade_fee,
-            'message': f'Short {quantity:.4f} {coin} @ ${price:.2f} (Fee: ${trade_fee:.2f})'
+            'side': side,
+            'fee': trade_fee  # 返回费用信息
         }
     
     def _execute_close(self, coin: str, decision: Dict, market_state: Dict, 
-                    portfolio: Dict) -> Dict:
-        position = None
-        for pos in portfolio['positions']:
-            if pos['coin'] == coin:
-                position = pos
-                break
+                    portfolio: Dict, positions_by_coin: Dict = None) -> Dict:
+        if positions_by_coin is None:
+            positions_by_coin = {pos['coin']: pos for pos in reversed(portfolio['positions'])}
+        position = positions_by_coin.get(coin)
         
         if not position:
             return {'coin': coin, 'error': 'Position not found'}
@@ -242,7 +366,8 @@ class TradingEngine:
             'signal': 'close_position',
             'quantity': quantity,
             'price': current_price,
+            'side': side,
+            'gross_pnl': gross_pnl,
             'pnl': net_pnl,
-            'fee': trade_fee,
-            'message': f'Close {coin}, Gross P&L: ${gross_pnl:.2f}, Fee: ${trade_fee:.2f}, Net P&L: ${net_pnl:.2f}'
+            'fee': trade_fee
         }
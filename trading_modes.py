@@ -13,10 +13,20 @@ This matches the real-world mental model and allows for:
   - Live + Full-Auto (autonomous trading)
 """
 from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
 from enum import Enum
-from typing import Dict, Optional, Tuple, List
-from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 import json
+import logging
+import threading
+import time
+
+from market_data import MarketDataFetcher
+from trading_engine import BackgroundWriter, TradingEngine
+
+logger = logging.getLogger(__name__)
 
 
 # ============ Enums ============
@@ -36,40 +46,86 @@ class AutomationLevel(Enum):
 
 # ============ Environment Executors ============
 
+@lru_cache(maxsize=64)
+def _to_symbol(coin: str) -> str:
+    """Binance trading pair for a coin (e.g., BTC -> BTCUSDT)"""
+    return f"{coin}USDT"
+
+
 class EnvironmentExecutor(ABC):
     """Abstract base class for environment-specific execution"""
 
     def __init__(self, db):
         self.db = db
+        # model_id -> TradingEngine that books trades into the database
+        self._engines = {}
+        # Orders may run concurrently; each booking reads cash and then
+        # writes, so bookings take turns
+        self._book_lock = threading.Lock()
+
+    def _engine(self, model_id: int) -> TradingEngine:
+        engine = self._engines.get(model_id)
+        if engine is None:
+            engine = self._engines[model_id] = TradingEngine(model_id, self.db, None, None)
+        return engine
+
+    def _book_trade(self, model_id: int, coin: str, decision: Dict,
+                    price: float, portfolio: Optional[Dict] = None,
+                    positions_by_coin: Optional[Dict] = None) -> Dict:
+        """Apply a trade to the positions and trade log, returning the engine result
+
+        A close only needs the coin's position, so it uses the caller's
+        portfolio snapshot (and its coin -> position index) if given;
+        entries always re-read cash.
+        """
+        engine = self._engine(model_id)
+        market_state = {coin: {'price': price}}
+        signal = decision.get('signal')
+        with self._book_lock:
+            if signal == 'close_position':
+                if portfolio is None:
+                    portfolio = self.db.get_portfolio(model_id, {coin: price})
+                return engine._execute_close(coin, decision, market_state, portfolio,
+                                             positions_by_coin=positions_by_coin)
+            portfolio = self.db.get_portfolio(model_id, {coin: price})
+            side = 'long' if signal == 'buy_to_enter' else 'short'
+            return engine._execute_enter(coin, decision, market_state, portfolio, side=side)
 
     @abstractmethod
     def execute_trade(self, model_id: int, coin: str, decision: Dict,
-                     market_data: Dict) -> Dict:
-        """Execute a trade in this environment"""
-        pass
+                     market_data: Dict, portfolio: Optional[Dict] = None,
+                     positions_by_coin: Optional[Dict] = None) -> Dict:
+        """Execute a trade in this environment
 
+        portfolio is the cycle's snapshot, if the caller has one, and
+        positions_by_coin its coin -> position index; they spare a close
+        from re-reading and scanning the model's positions.
+        """
+        pass
 
-class SimulationExecutor(EnvironmentExecutor):
-    """Simulated execution - updates database only, no real API calls"""
-
-    def execute_trade(self, model_id: int, coin: str, decision: Dict,
-                     market_data: Dict) -> Dict:
-        """Simulate trade execution"""
-        from trading_engine import TradingEngine
-        engine = TradingEngine(self.db)
-
+    def _simulate_trade(self, model_id: int, coin: str, decision: Dict,
+                        market_data: Dict, portfolio: Optional[Dict] = None,
+                        positions_by_coin: Optional[Dict] = None) -> Dict:
+        """Book a trade in the database only, through this executor's engine and lock"""
         signal = decision.get('signal')
         quantity = decision.get('quantity', 0)
-        leverage = decision.get('leverage', 1)
         current_price = market_data.get('price', 0)
 
         # Execute in simulation (database only)
-        if signal == 'buy_to_enter':
-            engine._execute_buy(model_id, coin, quantity, current_price, leverage)
-        elif signal == 'sell_to_enter':
-            engine._execute_sell(model_id, coin, quantity, current_price, leverage)
-        elif signal == 'close_position':
-            engine._execute_close(model_id, coin, current_price)
+        if signal in ('buy_to_enter', 'sell_to_enter', 'close_position'):
+            booked = self._book_trade(model_id, coin, decision, current_price,
+                                      portfolio, positions_by_coin)
+            if 'error' in booked:
+                return {
+                    'coin': coin,
+                    'signal': signal,
+                    'quantity': quantity,
+                    'price': current_price,
+                    'status': 'failed',
+                    'environment': 'simulation',
+                    'error': booked['error']
+                }
+            quantity = booked['quantity']
 
         return {
             'coin': coin,
@@ -81,16 +137,109 @@ class SimulationExecutor(EnvironmentExecutor):
         }
 
 
+class SimulationExecutor(EnvironmentExecutor):
+    """Simulated execution - updates database only, no real API calls"""
+
+    def execute_trade(self, model_id: int, coin: str, decision: Dict,
+                     market_data: Dict, portfolio: Optional[Dict] = None,
+                     positions_by_coin: Optional[Dict] = None) -> Dict:
+        """Simulate trade execution"""
+        return self._simulate_trade(model_id, coin, decision, market_data,
+                                    portfolio, positions_by_coin)
+
+
+class _OrderRateLimiter:
+    """Spaces calls at least 1/rate seconds apart, across threads"""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 class LiveExecutor(EnvironmentExecutor):
     """Live execution - real exchange API calls"""
 
+    # Orders per second sent on one exchange account; well inside Binance's
+    # default order-rate limits even when a cycle's orders run concurrently
+    MAX_ORDERS_PER_SECOND = 5
+
     def __init__(self, db, exchange):
         super().__init__(db)
         self.exchange = exchange
+        self._order_limiter = _OrderRateLimiter(self.MAX_ORDERS_PER_SECOND)
+
+    def _place_order(self, **order) -> Dict:
+        self._order_limiter.wait()
+        return self.exchange.place_market_order(**order)
+
+    def _book_filled(self, model_id: int, coin: str, decision: Dict, price: float,
+                     result: Dict, booking: Optional[Callable] = None,
+                     portfolio: Optional[Dict] = None,
+                     positions_by_coin: Optional[Dict] = None) -> Dict:
+        """Book an order the exchange has already filled
+
+        If the engine refuses the booking, or the booking transaction
+        raises and rolls back, the order still stands on the exchange, so
+        the result keeps its order_id and is marked 'executed_unbooked'
+        rather than failed.
+        """
+        try:
+            with booking(result) if booking else nullcontext():
+                booked = self._book_trade(model_id, coin, decision, price,
+                                          portfolio, positions_by_coin)
+                if 'error' in booked:
+                    self._mark_unbooked(model_id, result, booked['error'])
+        except Exception as e:
+            # Anything the hook wrote was rolled back with the booking; the
+            # incident is logged outside that transaction
+            self._mark_unbooked(model_id, result, f"Booking failed: {e}")
+        return result
+
+    def _mark_unbooked(self, model_id: int, result: Dict, error: str):
+        """Flag a filled order that has no matching position or trade row"""
+        result['status'] = 'executed_unbooked'
+        result['error'] = error
+
+        self.db.log_incident(
+            model_id=model_id,
+            incident_type='LIVE_BOOKING_FAILED',
+            severity='critical',
+            message=(f"Order {result['order_id']} for {result['coin']} filled on the "
+                     f"exchange but was not booked: {error}"),
+            details={
+                'coin': result['coin'],
+                'signal': result['signal'],
+                'order_id': result['order_id'],
+                'quantity': result['quantity'],
+                'price': result['price'],
+                'error': error
+            }
+        )
+
+        logger.critical("[LIVE] Order %s for %s filled but not booked: %s",
+                        result['order_id'], result['coin'], error)
 
     def execute_trade(self, model_id: int, coin: str, decision: Dict,
-                     market_data: Dict) -> Dict:
-        """Execute trade on real exchange"""
+                     market_data: Dict, portfolio: Optional[Dict] = None,
+                     positions_by_coin: Optional[Dict] = None,
+                     booking: Optional[Callable] = None) -> Dict:
+        """Execute trade on real exchange
+
+        booking(result), if given, returns a context manager the database
+        booking runs inside, once the exchange has filled the order; the
+        caller can add its own writes to the same transaction. If that
+        transaction fails, the caller's writes are rolled back and the
+        filled order comes back as 'executed_unbooked', never 'failed'.
+        """
         from binance.exceptions import BinanceAPIException
 
         if not self.exchange:
@@ -102,9 +251,9 @@ class LiveExecutor(EnvironmentExecutor):
                 message='Live mode enabled but no exchange client configured'
             )
 
-            print("[LIVE] ERROR: No exchange configured - falling back to simulation")
-            sim_executor = SimulationExecutor(self.db)
-            result = sim_executor.execute_trade(model_id, coin, decision, market_data)
+            logger.error("[LIVE] No exchange configured - falling back to simulation")
+            result = self._simulate_trade(model_id, coin, decision, market_data,
+                                          portfolio, positions_by_coin)
             result['environment'] = 'live'
             result['status'] = 'failed_no_exchange'
             return result
@@ -114,28 +263,22 @@ class LiveExecutor(EnvironmentExecutor):
         current_price = market_data.get('price', 0)
 
         # Convert coin to Binance symbol format (e.g., BTC -> BTCUSDT)
-        symbol = f"{coin}USDT"
+        symbol = _to_symbol(coin)
 
-        print(f"[LIVE] Executing on real exchange: {symbol} {signal} {quantity}")
+        logger.debug("[LIVE] Executing on real exchange: %s %s %s", symbol, signal, quantity)
 
         try:
             # Execute based on signal type
             if signal == 'buy_to_enter':
                 # Place market buy order
-                order = self.exchange.place_market_order(
+                order = self._place_order(
                     symbol=symbol,
                     side='BUY',
                     quantity=quantity,
                     test=False  # Real execution
                 )
 
-                # Update database (positions)
-                from trading_engine import TradingEngine
-                engine = TradingEngine(self.db)
-                engine._execute_buy(model_id, coin, quantity, current_price,
-                                   decision.get('leverage', 1))
-
-                return {
+                result = {
                     'coin': coin,
                     'signal': signal,
                     'quantity': quantity,
@@ -146,22 +289,19 @@ class LiveExecutor(EnvironmentExecutor):
                     'exchange_response': order
                 }
 
+                # Update database (positions)
+                return self._book_filled(model_id, coin, decision, current_price, result, booking)
+
             elif signal == 'sell_to_enter':
                 # Place market sell order (short)
-                order = self.exchange.place_market_order(
+                order = self._place_order(
                     symbol=symbol,
                     side='SELL',
                     quantity=quantity,
                     test=False
                 )
 
-                # Update database
-                from trading_engine import TradingEngine
-                engine = TradingEngine(self.db)
-                engine._execute_sell(model_id, coin, quantity, current_price,
-                                    decision.get('leverage', 1))
-
-                return {
+                result = {
                     'coin': coin,
                     'signal': signal,
                     'quantity': quantity,
@@ -172,10 +312,16 @@ class LiveExecutor(EnvironmentExecutor):
                     'exchange_response': order
                 }
 
+                # Update database
+                return self._book_filled(model_id, coin, decision, current_price, result, booking)
+
             elif signal == 'close_position':
                 # Get current position to determine order side
-                portfolio = self.db.get_portfolio(model_id)
-                position = portfolio.get('positions', {}).get(coin)
+                if positions_by_coin is None:
+                    if portfolio is None:
+                        portfolio = self.db.get_portfolio(model_id)
+                    positions_by_coin = {pos['coin']: pos for pos in reversed(portfolio['positions'])}
+                position = positions_by_coin.get(coin)
 
                 if not position or position['quantity'] == 0:
                     return {
@@ -189,22 +335,17 @@ class LiveExecutor(EnvironmentExecutor):
                     }
 
                 # Determine side (close long = sell, close short = buy)
-                close_side = 'SELL' if position['quantity'] > 0 else 'BUY'
+                close_side = 'SELL' if position['side'] == 'long' else 'BUY'
                 close_quantity = abs(position['quantity'])
 
-                order = self.exchange.place_market_order(
+                order = self._place_order(
                     symbol=symbol,
                     side=close_side,
                     quantity=close_quantity,
                     test=False
                 )
 
-                # Update database
-                from trading_engine import TradingEngine
-                engine = TradingEngine(self.db)
-                engine._execute_close(model_id, coin, current_price)
-
-                return {
+                result = {
                     'coin': coin,
                     'signal': signal,
                     'quantity': close_quantity,
@@ -215,6 +356,10 @@ class LiveExecutor(EnvironmentExecutor):
                     'exchange_response': order
                 }
 
+                # Update database
+                return self._book_filled(model_id, coin, decision, current_price, result, booking,
+                                         portfolio, positions_by_coin)
+
             else:
                 # Unknown signal
                 return {
@@ -244,7 +389,7 @@ class LiveExecutor(EnvironmentExecutor):
                 }
             )
 
-            print(f"[LIVE] API Error: {error_msg}")
+            logger.error("[LIVE] API Error: %s", error_msg)
 
             return {
                 'coin': coin,
@@ -272,7 +417,7 @@ class LiveExecutor(EnvironmentExecutor):
                 }
             )
 
-            print(f"[LIVE] Execution Error: {error_msg}")
+            logger.error("[LIVE] Execution Error: %s", error_msg)
 
             return {
                 'coin': coin,
@@ -288,145 +433,158 @@ class LiveExecutor(EnvironmentExecutor):
 # ============ Automation Handlers ============
 
 class AutomationHandler(ABC):
-    """Abstract base class for automation-specific logic"""
+    """Abstract base class for automation-specific logic
+
+    The validate-then-route loop is shared; each level only says what
+    happens to a trade that passes the risk checks (_accept) and, if it
+    needs to, to one that fails them (_skip).
+    """
+
+    # Value of results['automation'] and the key accepted trades go under
+    AUTOMATION = ''
+    ACCEPTED_KEY = ''
 
     def __init__(self, db, notifier=None):
         self.db = db
         self.notifier = notifier
 
-    @abstractmethod
     def process_decisions(self, model_id: int, decisions: Dict, market_data: Dict,
-                         explanations: Dict, risk_manager) -> Dict:
+                         explanations: Dict, risk_manager, context: Dict = None) -> Dict:
         """Process AI decisions according to automation level"""
-        pass
-
-
-class ManualHandler(AutomationHandler):
-    """Manual mode - display only, no execution"""
-
-    def process_decisions(self, model_id: int, decisions: Dict, market_data: Dict,
-                         explanations: Dict, risk_manager) -> Dict:
-        """Display decisions but don't execute"""
+        return self.process_actionable(model_id, self.actionable(decisions), market_data,
+                                       lambda coin: explanations.get(coin, {}),
+                                       risk_manager, context=context)
+
+    def process_actionable(self, model_id: int, actionable: List[Tuple[str, Dict]],
+                           market_data: Dict, get_explanation: Callable[[str], Dict],
+                           risk_manager,
+                           context: Dict = None) -> Dict:
+        """Process (coin, decision) pairs already stripped of holds
+
+        get_explanation(coin) builds the explanation for a coin, so handlers
+        only pay for it on trades they actually surface.
+        """
+        accepted = []
+        skipped = []
         results = {
-            'automation': 'manual',
-            'displayed': [],
-            'skipped': []
+            'automation': self.AUTOMATION,
+            self.ACCEPTED_KEY: accepted,
+            'skipped': skipped
         }
 
-        for coin, decision in decisions.items():
-            signal = decision.get('signal', 'hold')
-
-            if signal == 'hold':
-                continue
+        validations = risk_manager.validate_trades(model_id, dict(actionable), market_data,
+                                                   context=context)
 
+        for coin, decision in actionable:
             # Validate with risk manager
-            is_valid, reason = risk_manager.validate_trade(
-                model_id=model_id,
-                coin=coin,
-                decision=decision,
-                market_data=market_data.get(coin, {})
-            )
+            is_valid, reason = validations[coin]
 
-            if not is_valid:
-                results['skipped'].append({
-                    'coin': coin,
-                    'reason': reason,
-                    'decision': decision
-                })
-                continue
-
-            # Display decision (don't execute)
-            results['displayed'].append({
-                'coin': coin,
-                'signal': signal,
-                'decision': decision,
-                'explanation': explanations.get(coin, {}),
-                'action': 'displayed_only'
-            })
+            if is_valid:
+                accepted.append(self._accept(model_id, coin, decision, get_explanation))
+            else:
+                skipped.append(self._skip(model_id, coin, decision, reason))
 
         return results
 
+    @abstractmethod
+    def _accept(self, model_id: int, coin: str, decision: Dict,
+                get_explanation: Callable[[str], Dict]) -> Dict:
+        """Act on a trade that passed validation; returns its result entry"""
+        pass
 
-class SemiAutomatedHandler(AutomationHandler):
-    """Semi-automated mode - create pending decisions for approval"""
+    def _skip(self, model_id: int, coin: str, decision: Dict, reason: str) -> Dict:
+        """Result entry for a trade the risk manager rejected"""
+        return {
+            'coin': coin,
+            'reason': reason
+        }
 
-    def process_decisions(self, model_id: int, decisions: Dict, market_data: Dict,
-                         explanations: Dict, risk_manager) -> Dict:
-        """Create pending decisions for user approval"""
-        results = {
-            'automation': 'semi_automated',
-            'pending': [],
-            'skipped': []
+    @staticmethod
+    def actionable(decisions: Dict) -> List[Tuple[str, Dict]]:
+        """(coin, decision) pairs whose signal is anything but hold"""
+        return [(coin, decision) for coin, decision in decisions.items()
+                if decision.get('signal', 'hold') != 'hold']
+
+
+class ManualHandler(AutomationHandler):
+    """Manual mode - display only, no execution"""
+
+    AUTOMATION = 'manual'
+    ACCEPTED_KEY = 'displayed'
+
+    def _accept(self, model_id: int, coin: str, decision: Dict,
+                get_explanation: Callable[[str], Dict]) -> Dict:
+        """Display decision (don't execute)"""
+        return {
+            'coin': coin,
+            'signal': decision['signal'],
+            'decision': decision,
+            'explanation': get_explanation(coin),
+            'action': 'displayed_only'
         }
 
-        for coin, decision in decisions.items():
-            signal = decision.get('signal', 'hold')
+    def _skip(self, model_id: int, coin: str, decision: Dict, reason: str) -> Dict:
+        return {
+            'coin': coin,
+            'reason': reason,
+            'decision': decision
+        }
 
-            if signal == 'hold':
-                continue
 
-            # Validate with risk manager
-            is_valid, reason = risk_manager.validate_trade(
-                model_id=model_id,
-                coin=coin,
-                decision=decision,
-                market_data=market_data.get(coin, {})
-            )
+class SemiAutomatedHandler(AutomationHandler):
+    """Semi-automated mode - create pending decisions for approval"""
 
-            if not is_valid:
-                results['skipped'].append({
-                    'coin': coin,
-                    'reason': reason
-                })
-                continue
+    AUTOMATION = 'semi_automated'
+    ACCEPTED_KEY = 'pending'
 
-            # Create pending decision
-            decision_id = self.db.create_pending_decision(
-                model_id=model_id,
-                coin=coin,
-                decision=decision,
-                explanation=explanations.get(coin, {}),
-                expires_in_hours=1
-            )
+    def _accept(self, model_id: int, coin: str, decision: Dict,
+                get_explanation: Callable[[str], Dict]) -> Dict:
+        """Create a pending decision for user approval"""
+        signal = decision['signal']
 
-            results['pending'].append({
-                'decision_id': decision_id,
-                'coin': coin,
-                'signal': signal,
-                'quantity': decision.get('quantity')
-            })
+        decision_id = self.db.create_pending_decision(
+            model_id=model_id,
+            coin=coin,
+            decision=decision,
+            explanation=get_explanation(coin),
+            expires_in_hours=1
+        )
 
-            # Send notification
-            if self.notifier:
-                self.notifier.send_notification(
-                    title=f"🔔 Trade Approval Needed: {coin}",
-                    message=f"AI wants to {signal.upper()} {decision.get('quantity')} {coin}",
-                    priority="medium",
-                    model_id=model_id
-                )
+        # Send notification
+        if self.notifier:
+            self.notifier.send_notification(
+                title=f"🔔 Trade Approval Needed: {coin}",
+                message=f"AI wants to {signal.upper()} {decision.get('quantity')} {coin}",
+                priority="medium",
+                model_id=model_id
+            )
 
-        return results
+        return {
+            'decision_id': decision_id,
+            'coin': coin,
+            'signal': signal,
+            'quantity': decision.get('quantity')
+        }
 
 
 class FullyAutomatedHandler(AutomationHandler):
     """Fully automated mode - execute automatically after risk checks"""
 
+    AUTOMATION = 'fully_automated'
+    ACCEPTED_KEY = 'auto_approved'
+
     def __init__(self, db, notifier=None, auto_pause_checker=None):
         super().__init__(db, notifier)
         self.auto_pause_checker = auto_pause_checker
 
-    def process_decisions(self, model_id: int, decisions: Dict, market_data: Dict,
-                         explanations: Dict, risk_manager) -> Dict:
+    def process_actionable(self, model_id: int, actionable: List[Tuple[str, Dict]],
+                           market_data: Dict, get_explanation: Callable[[str], Dict],
+                           risk_manager,
+                           context: Dict = None) -> Dict:
         """Auto-execute after risk validation"""
-        results = {
-            'automation': 'fully_automated',
-            'auto_approved': [],
-            'skipped': []
-        }
-
         # Check auto-pause triggers first
         if self.auto_pause_checker:
-            should_pause, pause_reason = self.auto_pause_checker(model_id)
+            should_pause, pause_reason = self.auto_pause_checker(model_id, context)
             if should_pause:
                 # Return special result indicating pause needed
                 return {
@@ -436,43 +594,27 @@ class FullyAutomatedHandler(AutomationHandler):
                     'skipped': []
                 }
 
-        for coin, decision in decisions.items():
-            signal = decision.get('signal', 'hold')
-
-            if signal == 'hold':
-                continue
-
-            # Validate with risk manager
-            is_valid, reason = risk_manager.validate_trade(
-                model_id=model_id,
-                coin=coin,
-                decision=decision,
-                market_data=market_data.get(coin, {})
-            )
-
-            if not is_valid:
-                results['skipped'].append({
-                    'coin': coin,
-                    'reason': reason
-                })
-
-                # Log risk rejection
-                self.db.log_incident(
-                    model_id=model_id,
-                    incident_type='TRADE_REJECTED',
-                    severity='low',
-                    message=f'Trade rejected: {coin} - {reason}'
-                )
-                continue
+        return super().process_actionable(model_id, actionable, market_data,
+                                          get_explanation, risk_manager, context=context)
 
-            # Auto-approve
-            results['auto_approved'].append({
-                'coin': coin,
-                'signal': signal,
-                'decision': decision
-            })
+    def _accept(self, model_id: int, coin: str, decision: Dict,
+                get_explanation: Callable[[str], Dict]) -> Dict:
+        """Auto-approve"""
+        return {
+            'coin': coin,
+            'signal': decision['signal'],
+            'decision': decision
+        }
 
-        return results
+    def _skip(self, model_id: int, coin: str, decision: Dict, reason: str) -> Dict:
+        # Log risk rejection
+        self.db.log_incident(
+            model_id=model_id,
+            incident_type='TRADE_REJECTED',
+            severity='low',
+            message=f'Trade rejected: {coin} - {reason}'
+        )
+        return super()._skip(model_id, coin, decision, reason)
 
 
 # ============ Unified Trading Executor ============
@@ -487,24 +629,54 @@ class TradingExecutor:
       - Risk Manager: What's safe to execute
     """
 
-    def __init__(self, db, risk_manager, notifier=None, explainer=None):
+    __slots__ = ('db', 'risk_manager', 'notifier', 'explainer', 'market_fetcher',
+                 'executors', '_live_executors', 'handlers', '_model_cache')
+
+    # One statement text for every approval_events row, so sqlite3's
+    # per-connection statement cache reuses the compiled statement
+    _SQL_APPROVAL_INSERT = '''
+        INSERT INTO approval_events
+        (decision_id, model_id, approved, modified, modification_details,
+         execution_result, rejection_reason)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    # Seconds a cached models row stays fresh
+    MODEL_CACHE_TTL = 60
+
+    # Live orders are network-bound; one pool shared by every model caps the
+    # orders in flight (the per-second rate is LiveExecutor's limiter).
+    # Created on the first concurrent live cycle
+    _order_pool = None
+    _order_pool_lock = threading.Lock()
+
+    def __init__(self, db, risk_manager, notifier=None, explainer=None,
+                 market_fetcher=None):
         """
         Args:
             db: EnhancedDatabase instance
             risk_manager: RiskManager instance
             notifier: Notifier instance (optional)
             explainer: AIExplainer instance (optional)
+            market_fetcher: Shared MarketDataFetcher (optional, one is
+                created on first approval otherwise)
         """
         self.db = db
         self.risk_manager = risk_manager
         self.notifier = notifier
         self.explainer = explainer
+        self.market_fetcher = market_fetcher
 
         # Environment executors (LiveExecutor exchange client loaded per-model)
         self.executors = {
             TradingEnvironment.SIMULATION: SimulationExecutor(db),
-            TradingEnvironment.LIVE: None  # Created dynamically per model
         }
+        # model_id -> LiveExecutor, kept so the exchange client's HTTP
+        # session survives between cycles; dropped when credentials change
+        self._live_executors = {}
+
+        # model_id -> (loaded_at, models row); name and capital rarely change
+        self._model_cache = {}
 
         # Automation handlers
         self.handlers = {
@@ -515,6 +687,14 @@ class TradingExecutor:
             )
         }
 
+    def _get_model(self, model_id: int) -> Dict:
+        """Models row, re-read at most once per MODEL_CACHE_TTL"""
+        now = time.monotonic()
+        cached = self._model_cache.get(model_id)
+        if cached is None or now - cached[0] > self.MODEL_CACHE_TTL:
+            cached = self._model_cache[model_id] = (now, self.db.get_model(model_id))
+        return cached[1]
+
     def execute_trading_cycle(self, model_id: int, market_data: Dict,
                              ai_decisions: Dict) -> Dict:
         """
@@ -528,56 +708,55 @@ class TradingExecutor:
         Returns:
             Execution results
         """
-        # Get environment and automation level
-        environment = TradingEnvironment(self.db.get_trading_environment(model_id))
-        automation = AutomationLevel(self.db.get_automation_level(model_id))
+        model = self._get_model(model_id)
+
+        # Holds are dropped once here; handlers and the explainer only see the rest
+        actionable = AutomationHandler.actionable(ai_decisions)
+
+        # One read of mode, settings, portfolio and trade counts for the whole
+        # cycle, shared with the risk checks and auto-pause triggers. An
+        # all-hold cycle has nothing to validate, so it only reads the mode
+        # (the full-auto pause check then reads its own rows). Mode is never
+        # cached, so a pause or mode switch applies on the next cycle.
+        if actionable:
+            context = self.risk_manager.load_context(model_id, market_data, model=model)
+            config = context
+        else:
+            context = None
+            config = self.db.get_trading_config(model_id)
+        environment = TradingEnvironment(config['environment'])
+        automation = AutomationLevel(config['automation'])
 
-        model = self.db.get_model(model_id)
-        print(f"[{environment.value.upper()}|{automation.value.upper()}] Trading cycle for {model['name']}")
+        logger.info("[%s|%s] Trading cycle for %s", environment.value.upper(),
+                    automation.value.upper(), model['name'])
 
-        # Load exchange client for live environment
-        if environment == TradingEnvironment.LIVE:
-            exchange_client = self.db.get_exchange_client(model_id)
-            if not exchange_client:
-                print("[LIVE] WARNING: No exchange client configured - will fall back to simulation")
-                self.db.log_incident(
-                    model_id=model_id,
-                    incident_type='EXCHANGE_NOT_CONFIGURED',
-                    severity='high',
-                    message='Live trading enabled but no exchange credentials configured'
-                )
-            # Create LiveExecutor with the exchange client
-            self.executors[TradingEnvironment.LIVE] = LiveExecutor(self.db, exchange_client)
+        environment_executor = self._get_executor(model_id, environment)
 
         # Get portfolio
-        portfolio = self.db.get_portfolio(model_id, market_data)
-
-        # Generate explanations
-        explanations = {}
-        if self.explainer:
-            for coin, decision in ai_decisions.items():
-                explanations[coin] = self.explainer.create_explanation(
-                    coin=coin,
-                    decision=decision,
-                    market_data=market_data.get(coin, {}),
-                    portfolio=portfolio
-                )
-
-        # Log AI conversation
-        self.db.add_conversation(
-            model_id=model_id,
-            user_prompt="Market analysis request",
-            ai_response=json.dumps(ai_decisions)
+        portfolio = context['portfolio'] if context else None
+
+        # Explanations are generated on demand; only trades that pass the
+        # risk checks in manual and semi-auto mode are ever shown one
+        def get_explanation(coin: str) -> Dict:
+            if not self.explainer:
+                return {}
+            return self.explainer.create_explanation(coin, ai_decisions[coin],
+                                                     market_data.get(coin, {}), portfolio)
+
+        # Log AI conversation; encoded and written on the background writer
+        BackgroundWriter.for_db(self.db).enqueue_call(
+            self._log_conversation, model_id, ai_decisions
         )
 
         # STEP 1: Automation layer processes decisions
         automation_handler = self.handlers[automation]
-        processed = automation_handler.process_decisions(
+        processed = automation_handler.process_actionable(
             model_id=model_id,
-            decisions=ai_decisions,
+            actionable=actionable,
             market_data=market_data,
-            explanations=explanations,
-            risk_manager=self.risk_manager
+            get_explanation=get_explanation,
+            risk_manager=self.risk_manager,
+            context=context
         )
 
         # Handle auto-pause
@@ -603,31 +782,40 @@ class TradingExecutor:
             return processed
 
         # STEP 2: Environment layer executes approved decisions
-        environment_executor = self.executors[environment]
         executed_trades = []
 
         # Execute auto-approved trades (full auto) or displayed trades (manual)
         trades_to_execute = processed.get('auto_approved', [])
 
-        for trade_info in trades_to_execute:
+        # Closes look their position up in one index built per cycle; trades
+        # only get here from actionable decisions, so the portfolio is loaded
+        positions_by_coin = ({pos['coin']: pos for pos in reversed(portfolio['positions'])}
+                             if trades_to_execute else None)
+        calls = [partial(self._run_trade, environment_executor, model_id, trade_info,
+                         market_data, portfolio, positions_by_coin)
+                 for trade_info in trades_to_execute]
+        if environment == TradingEnvironment.LIVE and len(calls) > 1:
+            # Send the exchange orders together; results are handled in order
+            pool = self._get_order_pool()
+            futures = [pool.submit(call) for call in calls]
+            calls = [future.result for future in futures]
+
+        for trade_info, call in zip(trades_to_execute, calls):
             coin = trade_info['coin']
             decision = trade_info['decision']
 
             try:
-                result = environment_executor.execute_trade(
-                    model_id=model_id,
-                    coin=coin,
-                    decision=decision,
-                    market_data=market_data[coin]
-                )
+                result = call()
 
                 executed_trades.append(result)
 
                 # Send notification
                 if self.notifier and automation == AutomationLevel.FULLY_AUTOMATED:
+                    signal = str(decision.get('signal', '')).upper()
+                    price = (market_data.get(coin) or {}).get('price', 0)
                     self.notifier.send_notification(
                         title=f"✅ Trade Executed: {coin}",
-                        message=f"{decision.get('signal').upper()} {decision.get('quantity')} @ ${market_data[coin]['price']}",
+                        message=f"{signal} {decision.get('quantity')} @ ${price}",
                         priority="low",
                         model_id=model_id
                     )
@@ -646,28 +834,81 @@ class TradingExecutor:
                     message=f'Failed to execute {coin}: {str(e)}'
                 )
 
-        # Combine results
-        final_result = {
-            'environment': environment.value,
-            'automation': automation.value,
-            'executed': executed_trades,
-            **processed  # Include pending, skipped, etc.
-        }
+        # Combine results; the handler's dict (pending, skipped, etc.) is
+        # built per cycle, so it is extended in place rather than copied
+        processed['environment'] = environment.value
+        processed['executed'] = executed_trades
+
+        return processed
+
+    def _log_conversation(self, model_id: int, ai_decisions: Dict):
+        self.db.add_conversation(
+            model_id=model_id,
+            user_prompt="Market analysis request",
+            ai_response=json.dumps(ai_decisions)
+        )
+
+    @classmethod
+    def _get_order_pool(cls) -> ThreadPoolExecutor:
+        with cls._order_pool_lock:
+            if cls._order_pool is None:
+                cls._order_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='order')
+            return cls._order_pool
+
+    def _get_executor(self, model_id: int, environment: TradingEnvironment) -> EnvironmentExecutor:
+        """Environment executor for a model, building its LiveExecutor on first use"""
+        if environment != TradingEnvironment.LIVE:
+            return self.executors[environment]
 
-        return final_result
+        executor = self._live_executors.get(model_id)
+        if executor is None:
+            exchange_client = self.db.get_exchange_client(model_id)
+            if not exchange_client:
+                logger.warning("[LIVE] No exchange client configured - will fall back to simulation")
+                self.db.log_incident(
+                    model_id=model_id,
+                    incident_type='EXCHANGE_NOT_CONFIGURED',
+                    severity='high',
+                    message='Live trading enabled but no exchange credentials configured'
+                )
+                # Not cached, so newly saved credentials are picked up next cycle
+                return LiveExecutor(self.db, None)
+            executor = self._live_executors[model_id] = LiveExecutor(self.db, exchange_client)
+        return executor
+
+    def invalidate_live_executor(self, model_id: int):
+        """Forget a model's exchange client, e.g. after its credentials change"""
+        self._live_executors.pop(model_id, None)
+
+    @staticmethod
+    def _run_trade(executor: EnvironmentExecutor, model_id: int, trade_info: Dict,
+                   market_data: Dict, portfolio: Dict, positions_by_coin: Dict) -> Dict:
+        coin = trade_info['coin']
+        return executor.execute_trade(
+            model_id=model_id,
+            coin=coin,
+            decision=trade_info['decision'],
+            market_data=market_data[coin],
+            portfolio=portfolio,
+            positions_by_coin=positions_by_coin
+        )
 
     def approve_decision(self, decision_id: int, modified: bool = False,
-                        modifications: Dict = None) -> Dict:
-        """Approve a pending decision (semi-auto workflow)"""
+                        modifications: Dict = None, decision_data: Dict = None) -> Dict:
+        """Approve a pending decision (semi-auto workflow)
+
+        decision_data is the pending_decisions row if the caller already read it.
+        """
         # Get pending decision
-        decisions = self.db.get_pending_decisions(model_id=None, status='pending')
-        decision_data = next((d for d in decisions if d['id'] == decision_id), None)
+        if decision_data is None:
+            decision_data = self.db.get_pending_decision(decision_id)
 
-        if not decision_data:
+        if not decision_data or decision_data['status'] != 'pending':
             return {'success': False, 'error': 'Decision not found or already processed'}
 
-        # Check expiration
-        if datetime.now() > datetime.fromisoformat(decision_data['expires_at']):
+        # Check expiration; a legacy row with no usable expiry counts as expired
+        expires_at_ts = decision_data['expires_at_ts']
+        if expires_at_ts is None or time.time() > expires_at_ts:
             self.db.update_pending_decision(decision_id, status='expired')
             return {'success': False, 'error': 'Decision expired'}
 
@@ -675,118 +916,147 @@ class TradingExecutor:
         coin = decision_data['coin']
         decision = decision_data['decision_data']
 
-        # Apply modifications
-        if modified and modifications:
-            decision.update(modifications)
-            self.db.update_pending_decision(
-                decision_id,
-                status='approved',
-                modified_data=modifications
-            )
-        else:
-            self.db.update_pending_decision(decision_id, status='approved')
-
         # Get current market data
-        from market_data import MarketDataFetcher
-        market_fetcher = MarketDataFetcher(db=self.db)
-        market_data = market_fetcher.get_current_prices([coin])
+        if self.market_fetcher is None:
+            self.market_fetcher = MarketDataFetcher(db=self.db)
+        market_data = self.market_fetcher.get_current_prices([coin])
 
         # Execute using appropriate environment executor
         environment = TradingEnvironment(self.db.get_trading_environment(model_id))
-        executor = self.executors[environment]
+        executor = self._get_executor(model_id, environment)
+
+        # Apply modifications
+        if modified and modifications:
+            decision.update(modifications)
+        modification_details = json.dumps(modifications) if modified and modifications else None
+
+        def record_approval(result: Dict):
+            if modification_details:
+                self.db.update_pending_decision(
+                    decision_id,
+                    status='approved',
+                    modified_data=modifications
+                )
+            else:
+                self.db.update_pending_decision(decision_id, status='approved')
+            self._log_approval_event(
+                decision_id, model_id, approved=True, modified=modified,
+                modification_details=modification_details,
+                execution_result=json.dumps(result)
+            )
 
+        # The status change, the trade's rows and the approval event always
+        # commit together. A live order is sent before that transaction
+        # opens, so the write lock is never held across the exchange call
+        sends_order = (environment == TradingEnvironment.LIVE
+                       and executor.exchange is not None)
+        recorded = []
+
+        @contextmanager
+        def booking(result: Dict):
+            with self.db.transaction():
+                yield
+                record_approval(result)
+            recorded.append(True)
+
+        result = None
         try:
-            result = executor.execute_trade(model_id, coin, decision, market_data[coin])
-
-            # Log approval event
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO approval_events
-                (decision_id, model_id, approved, modified, modification_details, execution_result)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (decision_id, model_id, True, modified,
-                  json.dumps(modifications) if modifications else None,
-                  json.dumps(result)))
-            conn.commit()
-            conn.close()
+            if sends_order:
+                result = executor.execute_trade(model_id, coin, decision, market_data[coin],
+                                                booking=booking)
+                if not recorded:
+                    # Order failed or was skipped, or its booking rolled back;
+                    # either way the approval is recorded on its own
+                    with self.db.transaction():
+                        record_approval(result)
+            else:
+                with self.db.transaction():
+                    result = executor.execute_trade(model_id, coin, decision, market_data[coin])
+                    record_approval(result)
 
             return {'success': True, 'result': result}
 
         except Exception as e:
             error_msg = f"Execution failed: {str(e)}"
 
-            # Log error
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO approval_events
-                (decision_id, model_id, approved, modified, execution_result)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (decision_id, model_id, True, modified, json.dumps({'error': error_msg})))
-            conn.commit()
-            conn.close()
+            # Log error, keeping a live order's result (and its order_id) if
+            # the order went through before the failure
+            self._log_approval_event(
+                decision_id, model_id, approved=True, modified=modified,
+                execution_result=json.dumps({'error': error_msg, 'result': result}
+                                            if result else {'error': error_msg})
+            )
 
             return {'success': False, 'error': error_msg}
 
-    def reject_decision(self, decision_id: int, reason: str = None) -> Dict:
-        """Reject a pending decision"""
-        self.db.update_pending_decision(
-            decision_id,
-            status='rejected',
-            rejection_reason=reason
-        )
+    def reject_decision(self, decision_id: int, reason: str = None,
+                        decision_data: Dict = None) -> Dict:
+        """Reject a pending decision
 
-        # Log rejection
-        decisions = self.db.get_pending_decisions(model_id=None, status='rejected')
-        decision_data = next((d for d in decisions if d['id'] == decision_id), None)
-
-        if decision_data:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO approval_events
-                (decision_id, model_id, approved, rejection_reason)
-                VALUES (?, ?, ?, ?)
-            ''', (decision_id, decision_data['model_id'], False, reason))
-            conn.commit()
-            conn.close()
+        decision_data is the pending_decisions row if the caller already read it.
+        """
+        if decision_data is None:
+            decision_data = self.db.get_pending_decision(decision_id)
+
+        if not decision_data or decision_data['status'] != 'pending':
+            return {'success': False, 'error': 'Decision not found or already processed'}
+
+        # Status change and its approval event commit together
+        with self.db.transaction():
+            self.db.update_pending_decision(
+                decision_id,
+                status='rejected',
+                rejection_reason=reason
+            )
+
+            # Log rejection
+            self._log_approval_event(decision_id, decision_data['model_id'],
+                                     approved=False, rejection_reason=reason)
 
         return {'success': True}
 
-    def _check_auto_pause_triggers(self, model_id: int) -> Tuple[bool, str]:
-        """Check if any auto-pause triggers are hit (for full auto)"""
-        settings = self.db.get_model_settings(model_id)
+    def _log_approval_event(self, decision_id: int, model_id: int, approved: bool,
+                            modified: bool = False, modification_details: str = None,
+                            execution_result: str = None, rejection_reason: str = None):
+        """Record an approval/rejection in approval_events
+
+        Joins the caller's transaction when there is one, so the event
+        commits together with the status change it records.
+        """
+        with self.db.transaction() as conn:
+            conn.execute(self._SQL_APPROVAL_INSERT,
+                         (decision_id, model_id, approved, modified, modification_details,
+                          execution_result, rejection_reason))
+
+    def _check_auto_pause_triggers(self, model_id: int, context: Dict = None) -> Tuple[bool, str]:
+        """Check if any auto-pause triggers are hit (for full auto)
+
+        context is the cycle's risk context; without one the needed rows are read here.
+        """
+        settings = context['settings'] if context else self.db.get_model_settings(model_id)
 
         if not settings.get('auto_pause_enabled', True):
             return False, ""
 
         # Trigger 1: Consecutive losses
-        recent_trades = self.db.get_trades(model_id, limit=20)
-        consecutive_losses = 0
-        for trade in recent_trades:
-            if trade['pnl'] < 0:
-                consecutive_losses += 1
-            else:
-                break
+        consecutive_losses, wins, recent_trades = self.db.get_recent_trade_stats(
+            model_id, limit=20, window=10)
 
         threshold = settings.get('auto_pause_consecutive_losses', 5)
         if consecutive_losses >= threshold:
             return True, f"{consecutive_losses} consecutive losses (threshold: {threshold})"
 
         # Trigger 2: Win rate drop
-        if len(recent_trades) >= 10:
-            wins = sum(1 for t in recent_trades[:10] if t['pnl'] > 0)
-            win_rate = wins / 10 * 100
+        if recent_trades >= 10:
+            win_rate = wins / recent_trades * 100
             threshold = settings.get('auto_pause_win_rate_threshold', 40.0)
 
             if win_rate < threshold:
                 return True, f"Win rate dropped to {win_rate:.1f}% (threshold: {threshold}%)"
 
         # Trigger 3: Daily loss limit
-        portfolio = self.db.get_portfolio(model_id)
-        model = self.db.get_model(model_id)
-        initial_capital = model['initial_capital']
+        portfolio = context['portfolio'] if context else self.db.get_portfolio(model_id)
+        initial_capital = self._get_model(model_id)['initial_capital']
 
         daily_loss_pct = (portfolio['total_value'] - initial_capital) / initial_capital * 100
         threshold = settings.get('max_daily_loss_pct', 3.0)